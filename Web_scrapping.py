@@ -2,7 +2,6 @@ import re  # Import regular expressions
 import csv 
 from finalMapping import is_it_a_nationality
 from finalWordCloud import generate_word_cloud  
-from gliner import GLiNER
 import time
 import requests
 from bs4 import BeautifulSoup
@@ -14,8 +13,22 @@ from PIL import Image  # Import the Image module from PIL (Python Imaging Librar
 filename = 'countries_and_demonyms.csv'
 start_time = time.time()
 
-# Initialize GLiNER with the base model
-model = GLiNER.from_pretrained("urchade/gliner_multi-v2.1")
+# One keep-alive session for every download, so connections to the site are reused (as v3.3/fetcher.py does)
+session = requests.Session()
+# (connect, read) timeouts in seconds, so a stuck connection cannot block the script forever
+TIMEOUT = (10, 30)
+
+# GLiNER with the base model, loaded the first time it is needed (see get_model)
+model = None
+
+
+# Function to load the model on first use, so importing this file does not load torch and the weights
+def get_model():
+    global model
+    if model is None:
+        from gliner import GLiNER
+        model = GLiNER.from_pretrained("urchade/gliner_multi-v2.1")
+    return model
 
 # Define labels for entity prediction
 labels = ["Person", "Country", "Date", "Place", "City"]
@@ -31,7 +44,7 @@ os.makedirs(folder_name, exist_ok=True)
 def extract_entities(biography_content):
     all_entities = []
     for chunk in biography_content:
-        entities = model.predict_entities(chunk, labels, threshold=0.5)
+        entities = get_model().predict_entities(chunk, labels, threshold=0.5)
         all_entities.extend(entities)
 
     # Categorize entities into separate groups for better distinction
@@ -77,7 +90,7 @@ def extract_entities(biography_content):
 # Function to crawl a page and extract links
 def crawl_page(url):
     try:
-        response = requests.get(url)
+        response = session.get(url, timeout=TIMEOUT)
         response.raise_for_status()  # Raise an exception for HTTP errors
 
         soup = BeautifulSoup(response.content, "html.parser")
@@ -125,7 +138,11 @@ print(f"Crawling finished. Found {len(bio_urls)} bio pages.")
 # Now scrape each bio page, extract entities, and generate word clouds
 for bio_url in bio_urls:
     print(f"Scraping bio page: {bio_url}")
-    response = requests.get(bio_url)
+    try:
+        response = session.get(bio_url, timeout=TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        print(f"Error scraping {bio_url}: {e}")
+        continue
     soup = BeautifulSoup(response.text, 'html.parser')
 
     # Find the Biography and Exhibitions headers
@@ -1,6 +1,4 @@
 import csv
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 
 def generate_word_cloud(csv_file,title, save_path=None):
     """
@@ -14,6 +12,10 @@ def generate_word_cloud(csv_file,title, save_path=None):
     Returns:
         None: The function saves the word cloud to the specified file path if provided.
     """
+    # Imported here rather than at the top, so importing this module stays cheap
+    from wordcloud import WordCloud
+    import matplotlib.pyplot as plt
+
     try:
         # Read the CSV file and create a dictionary of words and their frequencies
         word_freq = {}
@@ -0,0 +1,46 @@
+import sys
+import timeit
+from finalCrawling import extract_links, extract_links_soup
+
+
+# Function to build a listing page similar to the encyclopedia's, with navigation, scripts and bio links
+def sample_page(link_count=400):
+    rows = []
+    for number in range(link_count):
+        rows.append(f'<li class="item"><a class="bio" href="/en/bios/Pages/Artist-{number}.aspx">Artist {number}</a>'
+                    f'<span>Painter &amp; sculptor, born 19{number % 100:02d}</span></li>')
+        if number % 10 == 0:
+            rows.append(f'<li><a href="/en/about/Pages/page-{number}.aspx?x=1&amp;y=2">About</a></li>')
+    return (
+        "<html><head><title>Artists</title><script>var s = '<a href=\"/bios/Pages/hidden.aspx\">';</script></head>"
+        "<body><!-- <a href='/en/bios/Pages/commented.aspx'>old</a> -->"
+        '<div id="nav"><a href="/en/Pages/default.aspx">Home</a></div>'
+        # Attribute values holding ">" or "href=" must not end the tag or be read as the link
+        '<a data-x="a>b" href="/en/bios/Pages/quoted-gt.aspx">Quoted</a>'
+        "<a title='see href=\"/en/bios/Pages/fake.aspx\"' href=\"/en/bios/Pages/real.aspx\">Real</a>"
+        f"<ul>{''.join(rows)}</ul></body></html>"
+    ).encode("utf-8")
+
+
+# Micro-benchmark of the regex link extractor against the BeautifulSoup one:
+#   python bench_link_extraction.py [saved_page.html] [repeats]
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as page_file:
+            content = page_file.read()
+    else:
+        content = sample_page()
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    url = "https://encyclopedia.mathaf.org.qa/en/bios/Pages/default.aspx"
+    url_path = "/bios/Pages/"
+
+    fast_links = extract_links(url, content, set(), url_path)
+    soup_links = extract_links_soup(url, content, set(), url_path)
+    print(f"Page size: {len(content)} bytes, links found: {len(fast_links)}")
+    print(f"Same links as BeautifulSoup: {fast_links == soup_links}")
+
+    fast_time = timeit.timeit(lambda: extract_links(url, content, set(), url_path), number=repeats) / repeats
+    soup_time = timeit.timeit(lambda: extract_links_soup(url, content, set(), url_path), number=repeats) / repeats
+    print(f"BeautifulSoup: {soup_time * 1000:.2f} ms per page")
+    print(f"Regex:         {fast_time * 1000:.2f} ms per page")
+    print(f"Speed-up:      {soup_time / fast_time:.1f}x")
@@ -0,0 +1,64 @@
+import sys
+import time
+from gliner import GLiNER
+from nerBatching import predict_in_batches
+from nerScheduler import NERScheduler
+from textChunker import chunk_text
+
+MODEL_NAME = "urchade/gliner_multi-v2.1"
+LABELS = ["Person", "Place", "City", "Country", "Date"]
+
+
+# Function to build a fixed corpus of biography-like chunks of mixed lengths
+def sample_chunks(pages=24):
+    cities = ["Doha", "Cairo", "Baghdad", "Beirut", "Paris", "Damascus", "Tunis", "London"]
+    countries = ["Qatar", "Egypt", "Iraq", "Lebanon", "France", "Syria", "Tunisia", "England"]
+    chunks = []
+    for number in range(pages):
+        sentences = [
+            f"Artist {number} was born in {cities[number % 8]}, {countries[number % 8]} in {1920 + number}.",
+            f"In {1945 + number} the artist studied painting in {cities[(number + 3) % 8]} with Jewad Selim.",
+            f"Later works were shown in {cities[(number + 5) % 8]} and collected by Mathaf.",
+        ]
+        # Pages of different lengths give chunks of different sizes, as on the real sites
+        chunks.extend(chunk_text(" ".join(sentences * (1 + number % 6)), max_tokens=120))
+    return chunks
+
+
+# Function to time a run and return the chunks per second and its result
+def measure(function, count):
+    started = time.perf_counter()
+    result = function()
+    return count / (time.perf_counter() - started), result
+
+
+# Benchmark of the per-chunk loop against batched inference on CPU:
+#   python bench_ner_batching.py [batch sizes, e.g. 4,8,16]
+if __name__ == "__main__":
+    batch_sizes = [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else [4, 8, 16]
+    model = GLiNER.from_pretrained(MODEL_NAME)
+    chunks = sample_chunks()
+    threshold = 0.5
+    print(f"{len(chunks)} chunks, labels {LABELS}")
+
+    # Warm-up, so the first measured call does not pay for lazy initialisation
+    model.predict_entities(chunks[0], LABELS, threshold=threshold)
+
+    loop_rate, loop_result = measure(
+        lambda: [model.predict_entities(chunk, LABELS, threshold=threshold) for chunk in chunks], len(chunks))
+    print(f"Loop (batch size 1): {loop_rate:.1f} chunks/s")
+    expected = [{(entity["text"], entity["label"]) for entity in entities} for entities in loop_result]
+
+    for batch_size in batch_sizes:
+        rate, result = measure(lambda: predict_in_batches(model, chunks, LABELS, threshold, batch_size), len(chunks))
+        same = [{(entity["text"], entity["label"]) for entity in entities} for entities in result] == expected
+        print(f"Batch size {batch_size:>3}: {rate:.1f} chunks/s ({rate / loop_rate:.1f}x), same entities: {same}")
+
+        # The same batch size, with the chunks grouped by length first
+        scheduler = NERScheduler(model, batch_size, max_wait=0.01)
+        rate, result = measure(lambda: scheduler.predict(chunks, LABELS, threshold), len(chunks))
+        scheduler.close()
+        same = [{(entity["text"], entity["label"]) for entity in entities} for entities in result] == expected
+        stats = scheduler.stats()
+        print(f"  by length    : {rate:.1f} chunks/s ({rate / loop_rate:.1f}x), same entities: {same}, "
+              f"{stats['fill_ratio']:.0%} fill, {stats['padding_ratio']:.0%} padding")
@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+from bench_ner_batching import LABELS, MODEL_NAME, sample_chunks
+from nerModel import NERModel
+from nerWorkerPool import NERWorkerPool
+
+
+# Function run in a worker: its resident and private memory in MB, from /proc (Linux)
+def worker_memory(_):
+    sizes = {}
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                sizes[name] = int(value.split()[0]) / 1024
+    time.sleep(0.1)  # So every worker gets one of the calls
+    return os.getpid(), sizes["Rss"], sizes["Private_Clean"] + sizes["Private_Dirty"]
+
+
+# Benchmark of the worker pool on CPU: chunks/s and memory per worker for each number of workers
+#   python bench_ner_pool.py [worker counts, e.g. 1,2,4,8] [batch size]
+if __name__ == "__main__":
+    counts = [int(count) for count in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1, 2, 4, os.cpu_count() or 1]
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    chunks = sample_chunks(pages=96)
+    threshold = 0.5
+    print(f"{len(chunks)} chunks, labels {LABELS}, batch size {batch_size}, {os.cpu_count()} cores")
+
+    # The model is loaded once; every pool below forks its workers from this process
+    model = NERModel(MODEL_NAME)
+    model.load()
+    single_rate = None
+    for count in counts:
+        pool = NERWorkerPool(model, count, batch_size=batch_size, max_wait=0.01)
+        # Warm-up, so every worker has run the model once before it is timed
+        pool.predict(chunks[:count * batch_size], LABELS, threshold)
+        started = time.perf_counter()
+        pool.predict(chunks, LABELS, threshold)
+        rate = len(chunks) / (time.perf_counter() - started)
+        # Measured after the run, so it includes what running the model wrote to each worker's memory
+        memory = {pid: (rss, private) for pid, rss, private in pool.executor.map(worker_memory, range(count))}
+        pool.close()
+        single_rate = single_rate or rate
+        rss = max(rss for rss, _ in memory.values())
+        private = max(private for _, private in memory.values())
+        print(f"{count:>3} workers x {pool.threads_per_worker} thread(s): {rate:.1f} chunks/s "
+              f"({rate / single_rate:.1f}x), per worker {rss:.0f} MB resident, {private:.0f} MB private")
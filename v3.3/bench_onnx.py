@@ -0,0 +1,55 @@
+import sys
+import time
+from bench_ner_batching import LABELS, MODEL_NAME, sample_chunks
+from nerBatching import predict_in_batches
+from nerModel import NERModel
+
+BACKENDS = {"torch": ("torch", False), "onnx": ("onnx", False), "onnx-int8": ("onnx", True)}
+
+
+# Function to compare the entities of a backend against the reference ones
+def agreement(expected, found):
+    """
+    Returns:
+        tuple: Precision and recall of the (chunk, text, label) triples, and
+            the largest score difference of the entities both found.
+    """
+    expected_triples = {(index, entity["text"], entity["label"]): entity["score"]
+                        for index, entities in enumerate(expected) for entity in entities}
+    found_triples = {(index, entity["text"], entity["label"]): entity["score"]
+                     for index, entities in enumerate(found) for entity in entities}
+    shared = expected_triples.keys() & found_triples.keys()
+    precision = len(shared) / len(found_triples) if found_triples else 1.0
+    recall = len(shared) / len(expected_triples) if expected_triples else 1.0
+    score_gap = max((abs(expected_triples[key] - found_triples[key]) for key in shared), default=0.0)
+    return precision, recall, score_gap
+
+
+# Benchmark of the torch model against its ONNX export, in float and int8, on the same chunks:
+#   python bench_onnx.py [backends, e.g. torch,onnx,onnx-int8] [batch size]
+if __name__ == "__main__":
+    names = sys.argv[1].split(",") if len(sys.argv) > 1 else list(BACKENDS)
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    chunks = sample_chunks()
+    threshold = 0.5
+    print(f"{len(chunks)} chunks, labels {LABELS}, batch size {batch_size}")
+
+    reference = None
+    torch_rate = None
+    for name in names:
+        backend, quantize = BACKENDS[name]
+        model = NERModel(MODEL_NAME, backend, quantize)
+        model.load()
+        # Warm-up, so the first measured call does not pay for lazy initialisation
+        model.predict_entities(chunks[0], LABELS, threshold=threshold)
+
+        started = time.perf_counter()
+        result = predict_in_batches(model, chunks, LABELS, threshold, batch_size)
+        rate = len(chunks) / (time.perf_counter() - started)
+        if reference is None:
+            reference, torch_rate = result, rate
+            print(f"{name:<10}: {rate:.1f} chunks/s (reference)")
+            continue
+        precision, recall, score_gap = agreement(reference, result)
+        print(f"{name:<10}: {rate:.1f} chunks/s ({rate / torch_rate:.1f}x), "
+              f"precision {precision:.1%}, recall {recall:.1%}, largest score difference {score_gap:.3f}")
@@ -0,0 +1,34 @@
+import sys
+import time
+from finalCrawling import crawl_and_extract_links, crawl_and_extract_links_concurrent
+from replay import ReplayServer
+
+
+# Function to time one crawl against the replay server
+def timed_crawl(label, crawl, *args, **kwargs):
+    started = time.perf_counter()
+    bio_urls = crawl(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {len(bio_urls)} bio pages in {elapsed:.2f}s")
+    return bio_urls
+
+
+# Offline crawl benchmark against a recorded site:
+#   python bench_replay.py <recording folder> <start URL> <website type> [latency] [error rate] [concurrency]
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("Usage: python bench_replay.py <recording folder> <start URL> <website type> [latency] [error rate] [concurrency]")
+        sys.exit(1)
+    folder, start_url, website_type = sys.argv[1], sys.argv[2], int(sys.argv[3])
+    latency = float(sys.argv[4]) if len(sys.argv) > 4 else 0.05
+    error_rate = float(sys.argv[5]) if len(sys.argv) > 5 else 0.0
+    concurrency = int(sys.argv[6]) if len(sys.argv) > 6 else 8
+
+    server = ReplayServer(folder, latency=latency, error_rate=error_rate, seed=1).start()
+    try:
+        sequential = timed_crawl("Sequential crawl", crawl_and_extract_links, start_url, website_type, "")
+        concurrent = timed_crawl(f"Concurrent crawl ({concurrency} in flight)", crawl_and_extract_links_concurrent,
+                                 start_url, website_type, "", concurrency=concurrency, per_host_limit=concurrency)
+        print(f"Same bio pages found: {sorted(sequential) == sorted(concurrent)}")
+    finally:
+        server.stop()
@@ -0,0 +1,37 @@
+import json
+import subprocess
+import sys
+
+# Modules a run may start from, and the heavy libraries that should stay unloaded until they are needed
+MODULES = ["finalCrawling", "finalWordCloud", "scrapper_v2", "web_scrapping_v3"]
+HEAVY_MODULES = ["gliner", "torch", "transformers", "matplotlib", "wordcloud"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+# Function to import a module in a fresh interpreter and report how long it took
+def measure_import(module):
+    output = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# Startup benchmark: cold import time of each entry module, and which heavy libraries it pulls in
+#   python bench_startup.py [repeats]
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    for module in MODULES:
+        try:
+            runs = [measure_import(module) for _ in range(repeats)]
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<18} failed to import: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        best = min(run["seconds"] for run in runs)
+        loaded = ", ".join(runs[0]["loaded"]) or "none"
+        print(f"{module:<18} {best * 1000:8.1f} ms   heavy libraries loaded: {loaded}")
@@ -0,0 +1,56 @@
+import sys
+import timeit
+import tracemalloc
+from htmlText import extract_between, extract_between_soup
+
+
+# Function to build a bio page similar to the encyclopedia's: heavy header, the biography, then a long footer
+def sample_page(paragraphs=40, footer_links=1500):
+    header = "".join(f'<link rel="stylesheet" href="/style/{number}.css"/><script>var config{number} = {{"a": "<b>"}};</script>'
+                     for number in range(50))
+    body = "".join(f"<p>In 19{number % 100:02d} the artist moved to Caf&eacute; &amp; Studio {number}, "
+                   f"where <em>paintings</em> of the period were shown.</p>" for number in range(paragraphs))
+    footer = "".join(f'<li><a href="/en/Pages/link-{number}.aspx">Related page {number}</a></li>' for number in range(footer_links))
+    return (
+        f"<html><head><title>Artist</title>{header}<style>p {{ color: red; }}</style></head>"
+        f"<body><div id='nav'>Home</div><h2>Biography</h2>{body}<h3>Sources</h3><ul>{footer}</ul></body></html>"
+    ).encode("utf-8")
+
+
+# Function to measure the peak memory of one call
+def peak_memory(function):
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+# Micro-benchmark of the single-pass text extractor against BeautifulSoup + str(soup) + regex:
+#   python bench_text_extraction.py [saved_page.html start_phrase end_phrase] [repeats]
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        with open(sys.argv[1], "rb") as page_file:
+            content = page_file.read()
+        start_phrase, end_phrase = sys.argv[2], sys.argv[3]
+        repeats = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+    else:
+        content = sample_page()
+        start_phrase, end_phrase = "Biography", "Sources"
+        repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    def stream():
+        return extract_between(content, start_phrase, end_phrase)
+
+    def soup():
+        return extract_between_soup(content.decode("utf-8", errors="replace"), start_phrase, end_phrase)
+
+    print(f"Page size: {len(content)} bytes")
+    # str(soup) writes '&' back as '&amp;', which the single pass decodes
+    print(f"Same words as BeautifulSoup: {(stream() or '').split() == (soup() or '').replace('&amp;', '&').split()}")
+
+    stream_time = timeit.timeit(stream, number=repeats) / repeats
+    soup_time = timeit.timeit(soup, number=repeats) / repeats
+    print(f"BeautifulSoup: {soup_time * 1000:.2f} ms, peak {peak_memory(soup) / 1024:.0f} KiB per page")
+    print(f"Single pass:   {stream_time * 1000:.2f} ms, peak {peak_memory(stream) / 1024:.0f} KiB per page")
+    print(f"Speed-up:      {soup_time / stream_time:.1f}x")
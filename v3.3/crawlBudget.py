@@ -0,0 +1,89 @@
+import time
+
+
+class CrawlBudget:
+    """
+    Limits for one crawl or scrape run: number of pages, link depth, total
+    wall-clock time, and the connect/read timeouts of every request. When a
+    limit is reached the run stops taking new pages and reports what it
+    managed to do.
+    """
+
+    def __init__(self, max_pages=None, max_depth=None, deadline=None, connect_timeout=10, read_timeout=30):
+        """
+        Args:
+            max_pages (int): Maximum number of pages to fetch (None for no limit).
+            max_depth (int): Maximum number of links followed from the start page.
+            deadline (float): Maximum run time in seconds, counted from start().
+            connect_timeout (float): Seconds to wait for a connection.
+            read_timeout (float): Seconds to wait for the server between bytes.
+        """
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.deadline = deadline
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.started_at = None
+        self.pages = 0
+        self.exhausted = None  # Which limit ended the run, if any
+
+    def start(self):
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        return self
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at if self.started_at is not None else 0.0
+
+    def remaining_time(self):
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - self.elapsed())
+
+    def allows_page(self):
+        """
+        Check whether another page may be fetched, remembering which limit
+        was hit the first time the answer is no.
+        """
+        self.start()
+        if self.exhausted:
+            return False
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            self.exhausted = f"max pages ({self.max_pages}) reached"
+        elif self.deadline is not None and self.remaining_time() <= 0:
+            self.exhausted = f"deadline ({self.deadline:g}s) reached"
+        return not self.exhausted
+
+    def stop(self, reason="stopped by the caller"):
+        """
+        End the run from another thread: from now on no more pages are allowed.
+        """
+        if not self.exhausted:
+            self.exhausted = reason
+
+    def allows_depth(self, depth):
+        return self.max_depth is None or depth <= self.max_depth
+
+    def count_page(self):
+        self.pages += 1
+
+    def request_timeout(self):
+        """
+        Return the (connect, read) timeout for the next request, shortened
+        so it never runs past the deadline.
+        """
+        remaining = self.remaining_time()
+        if remaining is None:
+            return (self.connect_timeout, self.read_timeout)
+        remaining = max(remaining, 0.1)
+        return (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+
+    def report(self, label, results, still_queued=0):
+        """
+        Print how the run ended, with partial results when a limit was hit.
+        """
+        if self.exhausted:
+            print(f"{label} stopped early: {self.exhausted}. Partial results: {results} after {self.pages} pages "
+                  f"in {self.elapsed():.1f}s, {still_queued} pages left unvisited.")
+        else:
+            print(f"{label} finished within budget: {results} after {self.pages} pages in {self.elapsed():.1f}s.")
@@ -0,0 +1,78 @@
+import sqlite3
+
+
+class CrawlCheckpoint:
+    """
+    On-disk copy of a crawl's state (frontier, visited URLs and bio URLs)
+    stored in SQLite, so an interrupted crawl can resume where it stopped.
+    """
+
+    def __init__(self, path, commit_every=20):
+        """
+        Args:
+            path (str): The SQLite file used to store the crawl state.
+            commit_every (int): Number of crawled pages between two commits.
+        """
+        self.path = path
+        self.commit_every = max(1, commit_every)
+        self.pending_pages = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS frontier (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE, depth INTEGER DEFAULT 0);
+            CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS bio_urls (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE);
+        """)
+        # Checkpoints written before depths were saved resume their frontier at depth 0
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(frontier)")}
+        if "depth" not in columns:
+            self.connection.execute("ALTER TABLE frontier ADD COLUMN depth INTEGER DEFAULT 0")
+        self.connection.commit()
+
+    def load(self, base_url):
+        """
+        Load the saved crawl state, or start a new one from base_url.
+
+        Returns:
+            tuple: (visited URLs as a set, (URL, depth) pairs to visit as a list, bio URLs as a list)
+        """
+        visited_urls = {row[0] for row in self.connection.execute("SELECT url FROM visited")}
+        urls_to_visit = [(url, depth or 0) for url, depth in self.connection.execute("SELECT url, depth FROM frontier ORDER BY id")]
+        bio_urls = [row[0] for row in self.connection.execute("SELECT url FROM bio_urls ORDER BY id")]
+
+        if not visited_urls and not urls_to_visit:
+            self.connection.execute("INSERT OR IGNORE INTO frontier (url, depth) VALUES (?, 0)", (base_url,))
+            self.connection.commit()
+            urls_to_visit = [(base_url, 0)]
+        else:
+            print(f"Resuming crawl from {self.path}: {len(visited_urls)} pages visited, "
+                  f"{len(urls_to_visit)} queued, {len(bio_urls)} bio pages found.")
+
+        return visited_urls, urls_to_visit, bio_urls
+
+    def record_page(self, url, new_links, is_bio, depth=0):
+        """
+        Save the result of crawling one page: mark it visited, queue the new
+        links it produced (at depth + 1) and remember it if it is a bio page.
+        Pass only the links the crawl queues, so none past its maximum depth
+        is saved.
+        """
+        self.connection.execute("INSERT OR IGNORE INTO visited (url) VALUES (?)", (url,))
+        self.connection.execute("DELETE FROM frontier WHERE url = ?", (url,))
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO frontier (url, depth) SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM visited WHERE url = ?)",
+            [(link, depth + 1, link) for link in new_links],
+        )
+        if is_bio:
+            self.connection.execute("INSERT OR IGNORE INTO bio_urls (url) VALUES (?)", (url,))
+
+        self.pending_pages += 1
+        if self.pending_pages >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self.connection.commit()
+        self.pending_pages = 0
+
+    def close(self):
+        self.commit()
+        self.connection.close()
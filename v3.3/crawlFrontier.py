@@ -0,0 +1,209 @@
+import hashlib
+import heapq
+import itertools
+import math
+from array import array
+from bisect import bisect_left
+from collections import deque
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+# Function to turn a URL into one canonical spelling so duplicates are caught
+def canonicalize_url(url):
+    """
+    Lowercase the scheme and host, drop the default port and the fragment,
+    and sort the query parameters.
+
+    Args:
+        url (str): An absolute URL.
+
+    Returns:
+        str: The canonical form of the URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{credentials}@{host}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+# Function to hash a URL into a 64-bit fingerprint
+def url_fingerprint(url):
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class FingerprintSet:
+    """
+    Set of URLs stored as sorted 64-bit fingerprints (8 bytes per URL).
+    New fingerprints go into a small buffer that is merged into the sorted
+    array once it grows past `buffer_size`.
+    """
+
+    def __init__(self, buffer_size=50000):
+        self.fingerprints = array("Q")
+        self.buffer = set()
+        self.buffer_size = buffer_size
+
+    def add(self, url):
+        fingerprint = url_fingerprint(url)
+        if fingerprint in self:
+            return
+        self.buffer.add(fingerprint)
+        if len(self.buffer) >= self.buffer_size:
+            # Only the buffer is sorted; merging it lazily never turns the whole array into Python ints
+            self.fingerprints = array("Q", heapq.merge(self.fingerprints, sorted(self.buffer)))
+            self.buffer = set()
+
+    def __contains__(self, url):
+        fingerprint = url if isinstance(url, int) else url_fingerprint(url)
+        if fingerprint in self.buffer:
+            return True
+        index = bisect_left(self.fingerprints, fingerprint)
+        return index < len(self.fingerprints) and self.fingerprints[index] == fingerprint
+
+    def __len__(self):
+        return len(self.fingerprints) + len(self.buffer)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter of URLs. Membership tests can give false
+    positives (a URL treated as already seen) at roughly `error_rate`,
+    but never false negatives.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, url):
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big")
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, url):
+        if url in self:
+            return
+        for position in self._positions(url):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, url):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+
+    def __len__(self):
+        return self.count
+
+
+# Function to build the set used to remember seen URLs
+def make_seen_set(compact=None):
+    """
+    Args:
+        compact (str): None for a plain set of URLs, "fingerprint" for
+            64-bit fingerprints, or "bloom" for a Bloom filter.
+    """
+    if compact == "fingerprint":
+        return FingerprintSet()
+    elif compact == "bloom":
+        return BloomFilter()
+    elif compact is None:
+        return set()
+    raise ValueError(f"Unknown compact mode: {compact}")
+
+
+class CrawlFrontier:
+    """
+    FIFO queue of URLs to crawl. URLs are canonicalized and deduplicated when
+    they are pushed, so each page is queued at most once.
+    """
+
+    def __init__(self, compact=None):
+        self.queue = deque()
+        self.seen = make_seen_set(compact)
+
+    def push(self, url, parent_yield=0, depth=0):
+        """
+        Queue a URL unless it was already queued or seen. parent_yield is
+        only used by PriorityFrontier; depth is the number of links
+        followed from the start page.
+
+        Returns:
+            bool: True if the URL was added.
+        """
+        url = canonicalize_url(url)
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self.queue.append((url, depth))
+        return True
+
+    def mark_seen(self, url):
+        self.seen.add(canonicalize_url(url))
+
+    def pop(self):
+        """
+        Returns:
+            tuple: (url, depth) of the next page to crawl.
+        """
+        return self.queue.popleft()
+
+    def __contains__(self, url):
+        return url in self.seen
+
+    def __len__(self):
+        return len(self.queue)
+
+
+# Function to score a URL for the priority frontier (lower is crawled first)
+def url_priority(url, url_path, parent_yield=0):
+    """
+    Args:
+        url (str): The URL to score.
+        url_path (str): Path fragment that marks target (bio/object) pages.
+        parent_yield (int): Number of target links found on the page that linked here.
+
+    Returns:
+        float: 0 for target pages. Listing pages (including the 'init=' /
+        'default' variants, which are only crawled for their links) score
+        between 1 and 2, lower when the page that linked to them had many
+        target links.
+    """
+    if url_path in url and not ('init=' in url or 'default' in url):
+        return 0.0
+    return 1.0 + 1.0 / (1 + parent_yield)
+
+
+class PriorityFrontier(CrawlFrontier):
+    """
+    Best-first frontier: target pages are crawled first, then listing
+    pages, those reached from pages rich in target links before the rest.
+    URLs with the same score keep their FIFO order.
+    """
+
+    def __init__(self, url_path, compact=None):
+        super().__init__(compact)
+        self.url_path = url_path
+        self.queue = []
+        self.counter = itertools.count()
+
+    def push(self, url, parent_yield=0, depth=0):
+        url = canonicalize_url(url)
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        heapq.heappush(self.queue, (url_priority(url, self.url_path, parent_yield), next(self.counter), url, depth))
+        return True
+
+    def pop(self):
+        _, _, url, depth = heapq.heappop(self.queue)
+        return url, depth
@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from crawlFrontier import canonicalize_url
+from finalCrawling import crawl_page, is_bio_url, resolve_url_path
+from workQueue import open_work_queue
+
+
+# Function to run one crawl worker: lease URLs from the shared queue until the crawl is done
+def run_crawl_worker(queue_location, website_type, url_path, worker_id=None, lease_seconds=120, idle_wait=1.0):
+    """
+    Args:
+        queue_location (str): Where the shared queue lives; see workQueue.open_work_queue.
+        website_type (int): 1 for Collection, 2 for Encyclopedia.
+        url_path (str): Path fragment that marks the links to follow.
+        worker_id (str): Name of this worker, shown in the queue (host:pid by default).
+        lease_seconds (float): How long a leased URL stays with this worker before
+            another worker may take it over.
+        idle_wait (float): Seconds to wait when the queue is empty but pages are still leased.
+
+    Returns:
+        int: Number of pages this worker crawled.
+    """
+    work_queue = open_work_queue(queue_location) if isinstance(queue_location, str) else queue_location
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    url_path = resolve_url_path(website_type, url_path)
+    crawled = 0
+
+    while True:
+        # Take back pages leased by workers that died or stalled
+        work_queue.requeue_expired()
+        current_url = work_queue.lease(worker_id, lease_seconds)
+        if current_url is None:
+            if work_queue.is_done():
+                break
+            time.sleep(idle_wait)
+            continue
+
+        print(f"[{worker_id}] Crawling: {current_url}")
+        # The shared queue removes duplicates, so there is no local visited set
+        new_links = crawl_page(current_url, set(), url_path)
+        work_queue.complete(current_url, new_links, is_bio_url(current_url, url_path))
+        crawled += 1
+
+    return crawled
+
+
+# Function to crawl with several worker processes sharing one queue, and return bio URLs
+def crawl_distributed(base_url, website_type, url_path, workers=4, queue_location="crawl_queue.sqlite", lease_seconds=120,
+                      known_urls=None, on_bio_url=None):
+    """
+    Start `workers` local processes on a shared queue seeded with base_url.
+    Workers started on other machines with the same queue location
+    (e.g. a Redis URL) join the same crawl.
+
+    Known URLs are recorded as bio pages without being crawled, and
+    on_bio_url is called with every bio URL once the workers are done.
+
+    Returns:
+        list: The bio URLs found by all workers.
+    """
+    if queue_location == "memory":
+        raise ValueError("The in-memory queue cannot be shared between processes.")
+
+    work_queue = open_work_queue(queue_location)
+    work_queue.mark_known([canonicalize_url(known_url) for known_url in known_urls or []])
+    work_queue.push([canonicalize_url(base_url)])
+
+    processes = [
+        multiprocessing.Process(target=run_crawl_worker, args=(queue_location, website_type, url_path),
+                                kwargs={"lease_seconds": lease_seconds}, name=f"crawl-worker-{number}")
+        for number in range(max(1, workers))
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    bio_urls = work_queue.bio_urls()
+    for bio_url in bio_urls if on_bio_url else []:
+        on_bio_url(bio_url)
+    return bio_urls
+
+
+# Start a single worker from the command line, e.g. on another machine:
+#   python distributedCrawl.py redis://queue-host:6379/0 2 /bios/Pages/
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python distributedCrawl.py <queue location> <website type> <url path>")
+        sys.exit(1)
+    pages = run_crawl_worker(sys.argv[1], int(sys.argv[2]), sys.argv[3])
+    print(f"Worker finished after crawling {pages} pages.")
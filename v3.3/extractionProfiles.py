@@ -0,0 +1,183 @@
+import re
+from htmlText import VisibleTextParser, decoded_blocks, extract_between
+
+
+# Function to tell the language of a page from its URL
+def language_of(url):
+    url = url.lower()
+    if "/en/" in url:
+        return "English"
+    elif "/ar/" in url:
+        return "Arabic"
+    return None
+
+
+# Function to compile a list of words into one case-insensitive pattern
+def compile_words(words):
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+
+
+class ExtractionProfile:
+    """
+    How to find the main content on one site's pages, and which entity
+    labels to look for in it. The content is the text of the content tags
+    (paragraphs) between a heading that contains a start word and the next
+    heading that contains an end word. When a page does not have those
+    headings, boundary phrases are searched in the page text instead.
+    """
+
+    def __init__(self, name, folder_name, start_headings, end_headings, labels, thresholds,
+                 heading_tags=("h1", "h2", "h3"), content_tags=("p",), phrases=None, verified=True):
+        """
+        Args:
+            name (str): Name of the profile, printed when it is used.
+            folder_name (str): Folder the results are written to.
+            start_headings (list): Words of the heading the content starts after.
+            end_headings (list): Words of the heading the content ends before.
+            labels (dict): Entity labels to predict, per language ("English", "Arabic").
+            thresholds (dict): GLiNER score threshold, per language.
+            heading_tags (tuple): Tags that count as headings.
+            content_tags (tuple): Tags whose text is kept between the headings.
+            phrases (dict): Fallback (start_phrase, end_phrase), per language.
+            verified (bool): The headings were checked on the site's pages. An
+                unchecked profile still gives the folder and labels, but the
+                content is found with phrases given by the operator.
+        """
+        self.name = name
+        self.folder_name = folder_name
+        self.labels = labels
+        self.thresholds = thresholds
+        self.heading_tags = frozenset(heading_tags)
+        self.content_tags = frozenset(content_tags)
+        self.phrases = phrases or {}
+        self.verified = verified
+        # Compiled once here, then used on every page
+        self.start_heading = compile_words(start_headings)
+        self.end_heading = compile_words(end_headings)
+
+    def extract(self, content, encoding="utf-8", language=None, block_size=65536, template=None):
+        """
+        Return the main content of a page as text, or None if neither the
+        headings nor the fallback phrases are found. Parsing stops at the
+        end heading. Paragraphs that belong to the site's template
+        (see siteTemplate.SiteTemplate) are left out, also from the
+        text found with the fallback phrases.
+        """
+        parser = SectionParser(self)
+        for block in decoded_blocks(content, encoding, block_size):
+            parser.feed(block)
+            if parser.done:
+                break
+        else:
+            parser.close()
+        paragraphs = template.strip(parser.paragraphs) if template is not None else parser.paragraphs
+        if parser.done and paragraphs:
+            return "\n".join(paragraphs)
+
+        start_phrase, end_phrase = self.phrases.get(language, (None, None))
+        if start_phrase and end_phrase and template is not None:
+            return template.text_between(content, start_phrase, end_phrase, encoding, block_size)
+        if start_phrase and end_phrase:
+            return extract_between(content, start_phrase, end_phrase, encoding, block_size)
+        return None
+
+
+class SectionParser(VisibleTextParser):
+    """
+    Streaming parser that keeps the text of each content tag found between
+    a profile's start heading and end heading.
+    """
+
+    def __init__(self, profile):
+        super().__init__(self.add_text)
+        self.profile = profile
+        self.heading = None  # Text of the heading being read, if any
+        self.heading_tag = None
+        self.block = None  # Text of the content tag being read, if any
+        self.block_tag = None
+        self.collecting = False
+        self.done = False
+        self.paragraphs = []
+
+    def add_text(self, text):
+        if self.heading is not None:
+            self.heading.append(text)
+        elif self.block is not None:
+            self.block.append(text)
+
+    def flush_block(self):
+        text = " ".join("".join(self.block).split())
+        if text:
+            self.paragraphs.append(text)
+        self.block = None
+
+    def handle_starttag(self, tag, attrs):
+        super().handle_starttag(tag, attrs)
+        if self.done:
+            return
+        if tag in self.profile.heading_tags:
+            if self.block is not None:
+                self.flush_block()
+            self.heading, self.heading_tag = [], tag
+        elif self.collecting and tag in self.profile.content_tags:
+            if self.block is not None:
+                self.flush_block()  # A content tag left open, e.g. <p> without </p>
+            self.block, self.block_tag = [], tag
+
+    def handle_endtag(self, tag):
+        super().handle_endtag(tag)
+        if self.done:
+            return
+        if self.heading is not None and tag == self.heading_tag:
+            text = "".join(self.heading)
+            self.heading = None
+            if not self.collecting:
+                self.collecting = bool(self.profile.start_heading and self.profile.start_heading.search(text))
+            elif self.profile.end_heading and self.profile.end_heading.search(text):
+                self.collecting = False
+                self.done = True
+        elif self.block is not None and tag == self.block_tag:
+            self.flush_block()
+
+
+# Built-in profiles, by website_type
+PROFILES = {
+    1: ExtractionProfile(
+        name="QM Collections",
+        folder_name="QM Collections",
+        start_headings=["Description", "About this object", "الوصف", "عن هذه القطعة"],
+        end_headings=["Details", "Object details", "Related", "التفاصيل", "ذات صلة"],
+        labels={
+            "English": ["Human", "Country", "Date", "Era", "Material"],
+            "Arabic": ["مادة", "عصر", "تاريخ", "دولة", "إنسان"],
+        },
+        thresholds={"English": 0.5, "Arabic": 0.6},
+        # These headings have not been checked on a recorded QM object page yet
+        verified=False,
+    ),
+    2: ExtractionProfile(
+        name="Mathaf Encyclopedia",
+        folder_name="Mathaf Encyclopedia",
+        start_headings=["Biography", "السيرة"],
+        end_headings=["Exhibitions", "المعارض"],
+        labels={
+            "English": ["Person", "Place", "City", "Country", "Date"],
+            "Arabic": ["مدينة", "مكان", "تاريخ", "دولة", "اسم"],
+        },
+        thresholds={"English": 0.5, "Arabic": 0.6},
+        heading_tags=("h1",),
+        phrases={"English": ("Biography", "Exhibitions"), "Arabic": ("السيرة", "المعارض")},
+    ),
+}
+
+
+# Function to return the profile of a website type, or None if there is none
+def get_profile(website_type):
+    return PROFILES.get(website_type)
+
+
+# Function to add or replace the profile of a website type
+def register_profile(website_type, profile):
+    PROFILES[website_type] = profile
@@ -0,0 +1,134 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeouts in seconds used when a call does not give its own
+DEFAULT_TIMEOUT = (10, 30)
+
+
+# Function to build the Accept-Encoding header from the decoders that are installed
+def accepted_encodings():
+    encodings = ["gzip", "deflate"]
+    try:
+        import brotli  # noqa: F401 - urllib3 decodes br responses when brotli is installed
+        encodings.append("br")
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append("br")
+        except ImportError:
+            pass
+    return ", ".join(encodings)
+
+
+class Fetcher:
+    """
+    One pooled requests Session shared by every download in the project,
+    so connections (and their TLS handshakes) are kept alive and reused.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, timeout=DEFAULT_TIMEOUT, max_retries=0):
+        """
+        Args:
+            pool_connections (int): Number of hosts to keep a connection pool for.
+            pool_maxsize (int): Number of connections kept alive per host.
+            timeout (tuple): Default (connect, read) timeout in seconds.
+            max_retries (int): Retries urllib3 makes on failed connections.
+        """
+        self.timeout = timeout
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries)
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.session.headers.update({
+            "Accept-Encoding": accepted_encodings(),
+            "Connection": "keep-alive",
+        })
+        self.lock = threading.Lock()
+        self.request_count = 0
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        with self.lock:
+            self.request_count += 1
+        return self.session.get(url, headers=headers, timeout=timeout or self.timeout, **kwargs)
+
+    def stats(self):
+        """
+        Report how many requests were sent and how many new connections
+        had to be opened for them.
+
+        Returns:
+            dict: requests, connections, reused (requests sent on an already open connection).
+        """
+        connections = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+        return {
+            "requests": self.request_count,
+            "connections": connections,
+            "reused": max(0, self.request_count - connections),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+_response_listeners = []  # Called with (url, response) after every download
+_url_rewriter = None  # Maps a URL to the address it is really fetched from (e.g. a replay server)
+
+
+# Function to (re)create the shared fetcher with new pool settings
+def configure(pool_connections=10, pool_maxsize=10, timeout=DEFAULT_TIMEOUT, max_retries=0):
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is not None:
+            _fetcher.close()
+        _fetcher = Fetcher(pool_connections, pool_maxsize, timeout, max_retries)
+    return _fetcher
+
+
+# Function to return the shared fetcher, creating it with the defaults on first use
+def get_fetcher():
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = Fetcher()
+        return _fetcher
+
+
+# Function to register a callback that sees every response, e.g. to archive pages
+def add_response_listener(listener):
+    _response_listeners.append(listener)
+
+
+# Function to remove a callback added with add_response_listener
+def remove_response_listener(listener):
+    if listener in _response_listeners:
+        _response_listeners.remove(listener)
+
+
+# Function to send every download to another address, or back to normal with None
+def set_url_rewriter(rewriter):
+    global _url_rewriter
+    _url_rewriter = rewriter
+
+
+# Function to download a URL through the shared, pooled session
+def fetch(url, headers=None, timeout=None, **kwargs):
+    target = _url_rewriter(url) if _url_rewriter else url
+    response = get_fetcher().get(target, headers=headers, timeout=timeout, **kwargs)
+    for listener in list(_response_listeners):
+        listener(url, response)
+    return response
+
+
+# Function to print the connection reuse statistics of the shared session
+def print_connection_stats():
+    stats = get_fetcher().stats()
+    print(f"HTTP requests: {stats['requests']}, connections opened: {stats['connections']}, "
+          f"requests on reused connections: {stats['reused']}")
@@ -1,57 +1,375 @@
+import asyncio
+import html
+import itertools
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
+from crawlCheckpoint import CrawlCheckpoint
+from fetcher import fetch
+from crawlFrontier import CrawlFrontier, PriorityFrontier, canonicalize_url, make_seen_set, url_priority
+from rateControl import THROTTLE_STATUS_CODES, parse_retry_after
+from crawlBudget import CrawlBudget
 
 
-# Function to crawl a page and extract links
-def crawl_page(url, visited_urls,url_path):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for HTTP errors
+# One pattern finds <a href> values and skips comments and scripts, whose links BeautifulSoup ignores.
+# Quoted attribute values are matched whole, so a ">" or "href=" inside one does not end or fake the tag.
+LINK_PATTERN = re.compile(
+    rb"""<!--.*?-->|<script\b.*?</script\s*>|<a\s(?:(?:[^>"']|"[^"]*"|'[^']*')*?\s)?href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+# Function to extract the matching links from an already downloaded page
+def extract_links(url, content, visited_urls, url_path):
+    """
+    Return the links on a page whose href contains url_path, joined to the
+    page URL and canonicalized. The page is scanned with a single regular
+    expression instead of building a BeautifulSoup tree; extract_links_soup
+    is the tree-based version it replaces.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    url_path_bytes = url_path.encode("utf-8")
+
+    links = []
+    for match in LINK_PATTERN.finditer(content):
+        href = match.group(1) or match.group(2) or match.group(3)
+        # Check if the link contains '/bios/Pages/' and is not already visited
+        if href is None or url_path_bytes not in href:
+            continue
+        href = html.unescape(href.decode("utf-8", errors="replace")).strip()
+        try:
+            next_url = canonicalize_url(urljoin(url, href))
+        except ValueError:  # A malformed link, e.g. a port that is not a number
+            continue
+        if next_url not in visited_urls:
+            links.append(next_url)
+
+    return links
+
 
-        soup = BeautifulSoup(response.content, "html.parser")
+# Function to extract the matching links by building a full BeautifulSoup tree
+def extract_links_soup(url, content, visited_urls, url_path):
+    from bs4 import BeautifulSoup  # Only this reference path needs it
+    soup = BeautifulSoup(content, "html.parser")
 
-        # Extract links and enqueue new URLs
-        links = []
-        for link in soup.find_all("a", href=True):
-            # Check if the link contains '/bios/Pages/' and is not already visited
-            if url_path in link["href"] and link["href"] not in visited_urls:
-                next_url = urljoin(url, link["href"])
+    # Extract links and enqueue new URLs
+    links = []
+    for link in soup.find_all("a", href=True):
+        # Check if the link contains '/bios/Pages/' and is not already visited
+        if url_path in link["href"]:
+            try:
+                next_url = canonicalize_url(urljoin(url, link["href"]))
+            except ValueError:  # A malformed link, e.g. a port that is not a number
+                continue
+            if next_url not in visited_urls:
                 links.append(next_url)
 
-        return links
+    return links
+
+
+class PageThrottled(requests.exceptions.HTTPError):
+    """Raised when the server answers 429 or 503, asking us to slow down."""
+
+    def __init__(self, url, status_code, retry_after=None):
+        super().__init__(f"{url} answered {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+# Function to download a page and return its links, raising on any HTTP or network error
+def fetch_page_links(url, visited_urls, url_path, validators=None, page_store=None, timeout=None):
+    # Send a conditional GET when we have validators from an earlier run
+    headers = validators.conditional_headers(url, "crawl") if validators else {}
+    response = fetch(url, headers=headers, timeout=timeout)
+
+    # Keep bio pages so the extraction stage does not download them again, also when they have not changed
+    if page_store is not None and response.status_code == 200 and is_bio_url(url, url_path):
+        page_store.put(url, response)
+
+    if validators and validators.is_unchanged(url, "crawl", response):
+        # The page did not change, so reuse the links found last time
+        return [link for link in validators.saved_links(url, "crawl") if link not in visited_urls]
+
+    if response.status_code in THROTTLE_STATUS_CODES:
+        raise PageThrottled(url, response.status_code, parse_retry_after(response.headers.get("Retry-After")))
+    response.raise_for_status()  # Raise an exception for HTTP errors
 
+    links = extract_links(url, response.content, set(), url_path)
+    if validators:
+        validators.save(url, "crawl", response, links)
+    return [link for link in links if link not in visited_urls]
+
+
+# Function to crawl a page and extract links
+def crawl_page(url, visited_urls,url_path, validators=None, page_store=None, timeout=None):
+    try:
+        return fetch_page_links(url, visited_urls, url_path, validators, page_store, timeout)
     except requests.exceptions.RequestException as e:
         print(f"Error crawling {url}: {e}")
         return []
 
-# Function to crawl and extract links from the website, and return bio URLs
-def crawl_and_extract_links(base_url, website_type, url_path):
-    visited_urls = set()  # Set to store visited URLs
-    urls_to_visit = [base_url]  # List to store URLs to visit next
-    bio_urls = []  # List to store URLs with '/bios/Pages/' in their path
+
+# Function to pick the url path that identifies target pages for a website type
+def resolve_url_path(website_type, url_path):
     if website_type == 1:
-        url_path = "/objects/"
+        return "/objects/"
     elif website_type == 2:
-        url_path = "/bios/Pages/"
+        return "/bios/Pages/"
+    return url_path
 
-    while urls_to_visit:
-        current_url = urls_to_visit.pop(0)  # Dequeue the first URL
 
-        if current_url in visited_urls:
-            continue
+# Function to check whether a crawled URL is a bio/object page worth scraping
+def is_bio_url(url, url_path):
+    if url_path not in url:
+        return False
+    # Skip listing variants such as URLs containing 'init=' or 'default'
+    return not ('init=' in url or 'default' in url)
+
+
+# Function to load the starting state of a crawl (fresh, resumed, or seeded with known URLs)
+def load_crawl_state(base_url, checkpoint, known_urls):
+    visited_urls = set()  # Set to store visited URLs
+    urls_to_visit = [(canonicalize_url(base_url), 0)]  # List of (URL, depth) to visit next
+    bio_urls = []  # List to store URLs with '/bios/Pages/' in their path
+
+    # Resume from the on-disk checkpoint if one was given
+    if checkpoint:
+        visited_urls, urls_to_visit, bio_urls = checkpoint.load(canonicalize_url(base_url))
 
-        print(f"Crawling: {current_url}")
+    # Bio URLs already known (e.g. from a sitemap) are kept but not downloaded again
+    for known_url in known_urls or []:
+        known_url = canonicalize_url(known_url)
+        if known_url not in visited_urls:
+            visited_urls.add(known_url)
+            bio_urls.append(known_url)
 
-        # Use the crawl_page function to get new links from the page
-        new_links = crawl_page(current_url, visited_urls,url_path)
-        visited_urls.add(current_url)
-        urls_to_visit.extend(new_links)
+    return visited_urls, urls_to_visit, bio_urls
 
-        # If the URL contains '/bios/Pages/', add it to the bio_urls list
-        if url_path in current_url:
-            if 'init=' in current_url or 'default' in current_url:
-                continue  # Skip URLs containing 'init='
-            bio_urls.append(current_url)
 
+# Function to crawl and extract links from the website, and return bio URLs
+def crawl_and_extract_links(base_url, website_type, url_path, checkpoint_path=None, validators=None, known_urls=None,
+                            compact=None, on_bio_url=None, page_store=None, best_first=False, budget=None):
+    url_path = resolve_url_path(website_type, url_path)
+    checkpoint = CrawlCheckpoint(checkpoint_path) if checkpoint_path else None
+    visited_urls, urls_to_visit, bio_urls = load_crawl_state(base_url, checkpoint, known_urls)
+
+    # The frontier remembers every URL queued or visited, so nothing is queued twice
+    # Best-first crawls target pages and productive listing pages before the rest
+    frontier = PriorityFrontier(url_path, compact) if best_first else CrawlFrontier(compact)
+    for visited_url in visited_urls:
+        frontier.mark_seen(visited_url)
+    for next_url, depth in urls_to_visit:
+        frontier.push(next_url, depth=depth)
+    del visited_urls, urls_to_visit
+
+    # Report the bio URLs we start with (resumed or already known) right away
+    for bio_url in bio_urls if on_bio_url else []:
+        on_bio_url(bio_url)
+
+    budget = budget or CrawlBudget()
+    budget.start()
+
+    try:
+        while frontier and budget.allows_page():
+            current_url, depth = frontier.pop()  # Dequeue the first URL
+
+            print(f"Crawling: {current_url}")
+
+            # Use the crawl_page function to get new links from the page
+            new_links = crawl_page(current_url, frontier,url_path, validators, page_store, budget.request_timeout())
+            budget.count_page()
+            page_yield = sum(1 for next_url in new_links if is_bio_url(next_url, url_path))
+            queued_links = new_links if budget.allows_depth(depth + 1) else []
+            for next_url in queued_links:
+                frontier.push(next_url, page_yield, depth + 1)
+
+            # If the URL contains '/bios/Pages/', add it to the bio_urls list
+            is_bio = is_bio_url(current_url, url_path)
+            if is_bio:
+                bio_urls.append(current_url)
+                if on_bio_url:
+                    on_bio_url(current_url)
+
+            if checkpoint:
+                checkpoint.record_page(current_url, queued_links, is_bio, depth)
+    finally:
+        if checkpoint:
+            checkpoint.close()
+
+    budget.report("Crawl", f"{len(bio_urls)} bio pages", len(frontier))
+    return bio_urls
+
+
+# Coroutine to crawl the website with several requests in flight at once
+async def crawl_and_extract_links_async(base_url, website_type, url_path, concurrency=10, per_host_limit=4, checkpoint_path=None,
+                                        validators=None, known_urls=None, compact=None, on_bio_url=None, page_store=None,
+                                        rate_controller=None, max_attempts=5, best_first=False, budget=None):
+    """
+    Crawl the website like crawl_and_extract_links, but keep up to
+    `concurrency` pages downloading at the same time, with at most
+    `per_host_limit` of them against any single host.
+
+    Args:
+        base_url (str): The page the crawl starts from.
+        website_type (int): 1 for Collection, 2 for Encyclopedia.
+        url_path (str): Path fragment that marks the links to follow.
+        concurrency (int): Maximum number of requests in flight overall.
+        per_host_limit (int): Maximum number of requests in flight per host.
+        checkpoint_path (str): Optional SQLite file to save and resume the crawl state.
+        validators (ValidatorStore): Optional store used to send conditional requests.
+        known_urls (list): Bio URLs already found elsewhere, kept without being downloaded.
+        compact (str): None, "fingerprint" or "bloom"; see crawlFrontier.make_seen_set.
+        on_bio_url (callable): Optional callback called with each bio URL as soon as it is found.
+        page_store (PageStore): Optional store the downloaded bio pages are written to.
+        rate_controller (AdaptiveRateController): Optional AIMD controller that adapts the
+            number of requests in flight (up to `concurrency`) to how the server responds.
+        max_attempts (int): With a rate controller, how many times a throttled page is retried.
+        best_first (bool): Crawl target pages and productive listing pages first
+            (see crawlFrontier.url_priority) instead of breadth-first.
+        budget (CrawlBudget): Optional page, depth, time and timeout limits.
+
+    Returns:
+        list: The bio URLs found, in the order they were crawled.
+    """
+    url_path = resolve_url_path(website_type, url_path)
+    checkpoint = CrawlCheckpoint(checkpoint_path) if checkpoint_path else None
+    visited_urls, pending_urls, bio_urls = load_crawl_state(base_url, checkpoint, known_urls)
+
+    # Every URL queued or visited, so nothing is queued twice
+    seen_urls = make_seen_set(compact)
+    for visited_url in visited_urls:
+        seen_urls.add(visited_url)
+    # Best-first crawls target pages and productive listing pages before the rest
+    urls_to_visit = asyncio.PriorityQueue() if best_first else asyncio.Queue()
+    order = itertools.count()
+
+    def enqueue(url, parent_yield=0, depth=0):
+        if best_first:
+            urls_to_visit.put_nowait((url_priority(url, url_path, parent_yield), next(order), url, depth))
+        else:
+            urls_to_visit.put_nowait((url, depth))
+
+    for pending_url, depth in pending_urls:
+        if pending_url not in seen_urls:
+            seen_urls.add(pending_url)
+            enqueue(pending_url, depth=depth)
+    del visited_urls, pending_urls
+
+    # Report the bio URLs we start with (resumed or already known) right away
+    for bio_url in bio_urls if on_bio_url else []:
+        on_bio_url(bio_url)
+
+    host_limits = {}  # One semaphore per host
+    loop = asyncio.get_running_loop()
+    # requests is blocking, so every download runs in a thread of this pool
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    attempts = {}  # Number of throttled attempts per URL
+    budget = budget or CrawlBudget()
+    budget.start()
+    skipped = 0  # Queued pages dropped once the budget ran out
+
+    def host_limit(url):
+        host = urlparse(url).netloc.lower()
+        if host not in host_limits:
+            host_limits[host] = asyncio.Semaphore(per_host_limit)
+        return host_limits[host]
+
+    # Coroutine to download a page under the rate controller, returning None if it was re-queued
+    async def fetch_with_rate_control(url, depth):
+        async with rate_controller.slot():
+            started = time.monotonic()
+            try:
+                links = await loop.run_in_executor(executor, fetch_page_links, url, seen_urls, url_path, validators, page_store,
+                                                   budget.request_timeout())
+            except PageThrottled as e:
+                rate_controller.record_throttle(e.retry_after, started)
+                attempts[url] = attempts.get(url, 0) + 1
+                if attempts[url] < max_attempts:
+                    enqueue(url, depth=depth)  # Try again once the rate has come down
+                    return None
+                print(f"Error crawling {url}: giving up after {attempts[url]} throttled attempts")
+                return []
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                rate_controller.record_error(started)
+                print(f"Error crawling {url}: {e}")
+                return []
+            except requests.exceptions.RequestException as e:
+                # Any other HTTP error (a dead link...) is still a prompt answer from the server
+                rate_controller.record_success(time.monotonic() - started)
+                print(f"Error crawling {url}: {e}")
+                return []
+            rate_controller.record_success(time.monotonic() - started)
+            return links
+
+    async def worker():
+        nonlocal skipped
+        while True:
+            current_url, depth = (await urls_to_visit.get())[-2:]
+            try:
+                # Once the budget is spent, drain the queue without fetching
+                if not budget.allows_page():
+                    skipped += 1
+                    continue
+                budget.count_page()
+
+                print(f"Crawling: {current_url}")
+                async with host_limit(current_url):
+                    if rate_controller:
+                        new_links = await fetch_with_rate_control(current_url, depth)
+                    else:
+                        new_links = await loop.run_in_executor(executor, crawl_page, current_url, seen_urls, url_path, validators,
+                                                               page_store, budget.request_timeout())
+                if new_links is None:
+                    continue
+
+                page_yield = sum(1 for next_url in new_links if is_bio_url(next_url, url_path))
+                queued_links = new_links if budget.allows_depth(depth + 1) else []
+                for next_url in queued_links:
+                    if next_url not in seen_urls:
+                        seen_urls.add(next_url)
+                        enqueue(next_url, page_yield, depth + 1)
+
+                is_bio = is_bio_url(current_url, url_path)
+                if is_bio:
+                    bio_urls.append(current_url)
+                    if on_bio_url:
+                        on_bio_url(current_url)
+
+                if checkpoint:
+                    checkpoint.record_page(current_url, queued_links, is_bio, depth)
+            finally:
+                urls_to_visit.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    queue_done = asyncio.create_task(urls_to_visit.join())
+    try:
+        # A worker only stops on an error that is not a failed request (from on_bio_url, the checkpoint,
+        # the page store...); stop the crawl and raise it, as the sequential crawler does, rather than
+        # waiting for a queue no worker is left to empty
+        await asyncio.wait([queue_done, *workers], return_when=asyncio.FIRST_COMPLETED)
+        for task in workers:
+            if task.done():
+                raise task.exception()
+    finally:
+        queue_done.cancel()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        executor.shutdown(wait=False)
+        if checkpoint:
+            checkpoint.close()
+
+    budget.report("Crawl", f"{len(bio_urls)} bio pages", skipped)
     return bio_urls
+
+
+# Function to run the asyncio crawler from regular (non-async) code
+def crawl_and_extract_links_concurrent(base_url, website_type, url_path, concurrency=10, per_host_limit=4, checkpoint_path=None,
+                                       validators=None, known_urls=None, compact=None, on_bio_url=None, page_store=None,
+                                       rate_controller=None, max_attempts=5, best_first=False, budget=None):
+    return asyncio.run(crawl_and_extract_links_async(base_url, website_type, url_path, concurrency, per_host_limit, checkpoint_path, validators, known_urls,
+                                                     compact, on_bio_url, page_store, rate_controller, max_attempts, best_first, budget))
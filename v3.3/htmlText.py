@@ -0,0 +1,147 @@
+import codecs
+import re
+from html.parser import HTMLParser
+
+# Elements whose content is never shown on the page
+SKIPPED_TAGS = frozenset(("script", "style"))
+
+
+class VisibleTextParser(HTMLParser):
+    """
+    Streaming HTML parser that passes the visible text of a page to
+    `on_text` as it is fed: entities are decoded, script and style
+    content is dropped, and every tag is replaced by a space.
+    """
+
+    def __init__(self, on_text):
+        super().__init__(convert_charrefs=True)
+        self.on_text = on_text
+        self.skipping = None  # The script/style tag we are inside of, if any
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skipping = tag
+        self.on_text(" ")
+
+    def handle_startendtag(self, tag, attrs):
+        self.on_text(" ")
+
+    def handle_endtag(self, tag):
+        if tag == self.skipping:
+            self.skipping = None
+        self.on_text(" ")
+
+    def handle_data(self, data):
+        if self.skipping is None:
+            self.on_text(data)
+
+
+class PhraseWindow:
+    """
+    Collects text as it streams in and keeps only what lies between the
+    first `start_phrase` and the first `end_phrase` after it. Text before
+    the start phrase is dropped as it arrives.
+    """
+
+    def __init__(self, start_phrase, end_phrase):
+        self.start_phrase = start_phrase
+        self.end_phrase = end_phrase
+        self.started = False
+        self.tail = ""  # Last characters seen, in case a phrase is split between two pieces
+        self.kept = []  # Text from the start phrase on
+        self.kept_length = 0
+        self.result = None
+
+    @property
+    def done(self):
+        return self.result is not None
+
+    def add(self, text):
+        if self.done:
+            return
+        if not self.started:
+            text = self.tail + text
+            index = text.find(self.start_phrase)
+            if index == -1:
+                self.tail = text[max(0, len(text) - len(self.start_phrase) + 1):] if self.start_phrase else ""
+                return
+            self.started = True
+            self.tail = ""
+            text = text[index:]
+
+        window = self.tail + text
+        index = window.find(self.end_phrase)
+        if index != -1:
+            end = self.kept_length - len(self.tail) + index
+            self.result = "".join(self.kept + [text])[:end]
+            self.kept = []
+            return
+        self.kept.append(text)
+        self.kept_length += len(text)
+        self.tail = window[max(0, len(window) - len(self.end_phrase) + 1):] if self.end_phrase else ""
+
+
+# Function to pick the encoding to decode a response body with, as response.text would
+def response_encoding(response):
+    return response.encoding or getattr(response, "apparent_encoding", None) or "utf-8"
+
+
+# Function to decode a page body block by block, so parsing can start (and stop) early
+def decoded_blocks(content, encoding="utf-8", block_size=65536):
+    if isinstance(content, str):
+        for offset in range(0, len(content), block_size):
+            yield content[offset:offset + block_size]
+        return
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for offset in range(0, len(content), block_size):
+        yield decoder.decode(content[offset:offset + block_size])
+    yield decoder.decode(b"", final=True)
+
+
+# Function to extract the visible text between two phrases in one pass over the HTML
+def extract_between(content, start_phrase, end_phrase, encoding="utf-8", block_size=65536):
+    """
+    Decode, parse and search the page block by block, stopping as soon as
+    the end phrase has been seen, so the rest of the page is never parsed
+    and no full-size copy of its text is built.
+
+    Args:
+        content (bytes or str): The raw page body.
+        start_phrase (str): Text that marks the start of the wanted content.
+        end_phrase (str): Text that marks its end (searched after the start).
+        encoding (str): Encoding of `content` when it is bytes.
+        block_size (int): Number of bytes decoded and parsed at a time.
+
+    Returns:
+        str: The visible text from the start phrase up to the end phrase,
+        or None if either phrase is not on the page.
+    """
+    window = PhraseWindow(start_phrase, end_phrase)
+    pieces = []
+    parser = VisibleTextParser(pieces.append)
+
+    for block in decoded_blocks(content, encoding, block_size):
+        parser.feed(block)
+        window.add("".join(pieces))
+        pieces.clear()
+        if window.done:
+            return window.result
+
+    parser.close()
+    window.add("".join(pieces))
+    return window.result
+
+
+# Function to extract the same text the way the scraper used to (kept for comparison)
+def extract_between_soup(text, start_phrase, end_phrase):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(text, "html.parser")
+    clean_content = re.sub(r'<[^>]+>', ' ', str(soup))
+    start_index = clean_content.find(start_phrase)
+    end_index = clean_content.find(end_phrase, start_index)
+    if start_index != -1 and end_index != -1:
+        return clean_content[start_index:end_index]
+    return None
@@ -0,0 +1,66 @@
+# Function to run the model on many texts, a batch of `batch_size` texts per forward pass
+def predict_in_batches(model, texts, labels, threshold, batch_size=8, cache=None):
+    """
+    Args:
+        model (GLiNER): The loaded model.
+        texts (list): Chunks to find entities in.
+        labels (list): Entity labels to predict.
+        threshold (float): Minimum score of a returned entity.
+        batch_size (int): Number of chunks per forward pass.
+        cache (NERCache): Cache to read and fill, so only unseen chunks reach the model.
+
+    Returns:
+        list: One list of entity dicts per text, in the order of `texts`.
+    """
+    results = [None] * len(texts)
+    missing = []  # Indexes of the texts the model has to see
+    for index, text in enumerate(texts):
+        if cache is not None:
+            results[index] = cache.get(text, labels, threshold)
+        if results[index] is None:
+            missing.append(index)
+
+    for offset in range(0, len(missing), batch_size):
+        batch = missing[offset:offset + batch_size]
+        predicted = model.batch_predict_entities([texts[index] for index in batch], labels, threshold=threshold)
+        for index, entities in zip(batch, predicted):
+            results[index] = entities
+            if cache is not None:
+                cache.put(texts[index], labels, threshold, entities)
+    return results
+
+
+# Function to find the entities of several pages at once, batching chunks that share labels and threshold
+def predict_pages(model, pages, batch_size=8, cache=None, scheduler=None):
+    """
+    Args:
+        model (GLiNER): The loaded model.
+        pages (list): (page_id, chunks, labels, threshold) for each page.
+        batch_size (int): Number of chunks per forward pass.
+        cache (NERCache): See predict_in_batches.
+        scheduler (NERScheduler): When given, chunks are submitted to it and
+            batched by length instead (its own batch size and cache are used).
+
+    Returns:
+        dict: page_id -> list of the entity dicts found in all of its chunks.
+    """
+    if scheduler is not None:
+        futures = [(page_id, scheduler.submit(chunk, labels, threshold))
+                   for page_id, chunks, labels, threshold in pages for chunk in chunks]
+        entities_by_page = {page_id: [] for page_id, _, _, _ in pages}
+        for page_id, future in futures:
+            entities_by_page[page_id].extend(future.result())
+        return entities_by_page
+
+    # Chunks from different pages share a batch when they are predicted with the same settings
+    groups = {}
+    for page_id, chunks, labels, threshold in pages:
+        group = groups.setdefault((tuple(labels), threshold), [])
+        group.extend((page_id, chunk) for chunk in chunks)
+
+    entities_by_page = {page_id: [] for page_id, _, _, _ in pages}
+    for (labels, threshold), items in groups.items():
+        predicted = predict_in_batches(model, [chunk for _, chunk in items], list(labels), threshold, batch_size, cache)
+        for (page_id, _), entities in zip(items, predicted):
+            entities_by_page[page_id].extend(entities)
+    return entities_by_page
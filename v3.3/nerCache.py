@@ -0,0 +1,125 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+class NERCache:
+    """
+    Entities predicted for each chunk, saved in SQLite so a chunk that was
+    already seen with the same labels, threshold and model costs a lookup
+    instead of a forward pass. The least recently used entries are evicted
+    once the cache holds more than `max_entries` chunks.
+    """
+
+    def __init__(self, path, model_id, max_entries=200000):
+        """
+        Args:
+            path (str): The SQLite file used to store the entities.
+            model_id (str): Name and version of the model; entities of other models are never returned.
+            max_entries (int): Number of chunks kept before the oldest are evicted.
+        """
+        self.path = path
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS entities (
+                key TEXT PRIMARY KEY, spans TEXT, last_used REAL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entities_last_used ON entities (last_used)")
+        # Readers are not blocked by a writer, so several processes can share the cache
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.commit()
+        self.entries = self.connection.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+        self.touched = {}  # key -> time of the hit, written at the next commit so lookups stay read-only
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def key(self, text, labels, threshold):
+        """
+        Hash of everything the predicted entities depend on.
+        """
+        identity = json.dumps([self.model_id, sorted(labels), threshold, text], ensure_ascii=False)
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def get(self, text, labels, threshold):
+        """
+        Return the cached entities of a chunk, or None on a miss.
+        """
+        key = self.key(text, labels, threshold)
+        with self.lock:
+            row = self.connection.execute("SELECT spans FROM entities WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.touched[key] = time.time()
+            return json.loads(row[0])
+
+    def put(self, text, labels, threshold, entities):
+        key = self.key(text, labels, threshold)
+        with self.lock:
+            cursor = self.connection.execute("INSERT OR IGNORE INTO entities VALUES (?, ?, ?)",
+                                             (key, json.dumps(entities, ensure_ascii=False), time.time()))
+            self.entries += cursor.rowcount
+            # Committed right away: a write is cheap next to the forward pass that produced it
+            self._flush()
+
+    def predict(self, model, text, labels, threshold):
+        """
+        Return the entities of a chunk from the cache, running the model
+        only on a miss.
+        """
+        entities = self.get(text, labels, threshold)
+        if entities is None:
+            entities = model.predict_entities(text, labels, threshold=threshold)
+            self.put(text, labels, threshold, entities)
+        return entities
+
+    def _flush(self):
+        self.connection.executemany("UPDATE entities SET last_used = ? WHERE key = ?",
+                                    [(used, key) for key, used in self.touched.items()])
+        self.touched = {}
+        self._evict()
+        self.connection.commit()
+
+    def _evict(self):
+        # Drop down to 90% of the limit, so eviction does not run on every commit
+        excess = self.entries - self.max_entries
+        if excess <= 0:
+            return
+        excess += self.max_entries // 10
+        self.connection.execute(
+            "DELETE FROM entities WHERE key IN (SELECT key FROM entities ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self.entries -= excess
+        self.evicted += excess
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self.entries,
+            "evicted": self.evicted,
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"NER cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), "
+              f"{stats['entries']} chunks stored, {stats['evicted']} evicted")
+
+    def commit(self):
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        self.commit()
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+
+MODEL_NAME = "urchade/gliner_multi-v2.1"
+BACKENDS = ("torch", "onnx")
+
+
+class NERModel:
+    """
+    Handle to the GLiNER model that only imports gliner (and torch) and
+    loads the weights the first time the model is used, so crawl-only and
+    CSV-only runs never pay for them. The model's own attributes and
+    methods (predict_entities, batch_predict_entities, config...) can be
+    used on the handle directly.
+
+    With backend="onnx" the model is exported to ONNX once (see
+    onnxBackend.py) and run through ONNX Runtime, with int8 weights when
+    `quantize` is set; predict_entities returns the same entity dicts.
+    """
+
+    def __init__(self, name=MODEL_NAME, backend="torch", quantize=False, onnx_folder=None):
+        """
+        Args:
+            name (str): Name of the model on the Hugging Face hub, or a local folder.
+            backend (str): "torch" or "onnx".
+            quantize (bool): Use int8 weights (ONNX backend only).
+            onnx_folder (str): Folder for the exported model (default: onnx/<model name>).
+        """
+        self.name = name
+        self.model = None
+        self.backend = None
+        self.use_backend(backend, quantize, onnx_folder)
+        self.lock = threading.Lock()
+        self.load_seconds = None
+        self.threads = None  # Threads of an ONNX Runtime session; torch threads are set with torch.set_num_threads
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+    def use_backend(self, backend, quantize=False, onnx_folder=None):
+        """
+        Choose how the model runs; only possible before it is loaded.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        if quantize and backend != "onnx":
+            raise ValueError("Only the ONNX backend can run a quantized model")
+        if self.loaded:
+            raise RuntimeError(f"{self.name} is already loaded with the {self.backend} backend")
+        self.backend = backend
+        self.quantize = quantize
+        self.onnx_folder = onnx_folder or os.path.join("onnx", self.name.replace("/", "_"))
+
+    def load(self):
+        """
+        Return the loaded model, loading it on the first call.
+        """
+        with self.lock:
+            if self.model is None:
+                started = time.perf_counter()
+                if self.backend == "onnx":
+                    from onnxBackend import load_onnx_model
+                    self.model = load_onnx_model(self.name, self.onnx_folder, self.quantize, self.threads)
+                else:
+                    from gliner import GLiNER
+                    self.model = GLiNER.from_pretrained(self.name)
+                self.load_seconds = time.perf_counter() - started
+                print(f"Loaded {self.name} ({self.backend_label}) in {self.load_seconds:.1f}s")
+            return self.model
+
+    def prepare(self):
+        """
+        For the ONNX backend, export (and quantize) the model if that was not
+        done yet, in a separate process, so loading it later only reads the files.
+        """
+        if self.backend == "onnx":
+            from onnxBackend import export_onnx_in_subprocess
+            export_onnx_in_subprocess(self.name, self.onnx_folder, self.quantize)
+
+    @property
+    def backend_label(self):
+        return "onnx-int8" if self.quantize else self.backend
+
+    @property
+    def model_id(self):
+        """
+        Name of the model, library version and backend, so cached entities of
+        another model (or of the quantized one, whose scores differ slightly) are never reused.
+        """
+        suffix = "" if self.backend == "torch" else f"+{self.backend_label}"
+        try:
+            from importlib.metadata import version
+            return f"{self.name}@gliner-{version('gliner')}{suffix}"
+        except Exception:
+            return f"{self.name}{suffix}"
+
+    def __getattr__(self, attribute):
+        # Only reached for attributes the handle does not have itself (or before __init__ ran, e.g. when unpickling)
+        if attribute.startswith("_") or "lock" not in self.__dict__:
+            raise AttributeError(attribute)
+        return getattr(self.load(), attribute)
@@ -0,0 +1,173 @@
+import threading
+import time
+from concurrent.futures import Future
+from textChunker import WORD_PATTERN
+
+
+class NERScheduler:
+    """
+    Dynamic batching in front of the model. Chunks are submitted one by
+    one from the extraction stage and put in buckets by label set,
+    threshold and word count, so a batch holds chunks of about the same
+    length and little of each forward pass is spent on padding. A bucket
+    is run as soon as it holds `batch_size` chunks, or once its oldest
+    chunk has waited `max_wait` seconds.
+    """
+
+    def __init__(self, model, batch_size=8, max_wait=0.05, bucket_width=32, cache=None):
+        """
+        Args:
+            model (GLiNER): The loaded model.
+            batch_size (int): Number of chunks per forward pass.
+            max_wait (float): Seconds a chunk may wait for its batch to fill.
+            bucket_width (int): Word counts within this range share a bucket.
+            cache (NERCache): Cache to read before, and fill after, each prediction.
+        """
+        self.model = model
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.bucket_width = bucket_width
+        self.cache = cache
+        self.condition = threading.Condition()
+        self.buckets = {}  # (labels, threshold, bucket) -> [(text, words, future, submitted_at)]
+        self.waiting = 0
+        self.closed = False
+        self.batches = 0
+        self.chunks = 0
+        self.words = 0
+        self.padded_words = 0  # Words the batches would hold if every chunk were as long as the longest
+        self.thread = threading.Thread(target=self._run, name="ner-scheduler", daemon=True)
+        self.thread.start()
+
+    def submit(self, text, labels, threshold):
+        """
+        Queue a chunk for prediction.
+
+        Returns:
+            Future: Resolves to the chunk's list of entity dicts.
+        """
+        future = Future()
+        if self.cache is not None:
+            entities = self.cache.get(text, labels, threshold)
+            if entities is not None:
+                future.set_result(entities)
+                return future
+        words = getattr(text, "token_count", None) or len(WORD_PATTERN.findall(text))
+        key = (tuple(labels), threshold, words // self.bucket_width)
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("The scheduler is closed")
+            self.buckets.setdefault(key, []).append((text, words, future, time.monotonic()))
+            self.waiting += 1
+            self.condition.notify()
+        return future
+
+    def predict(self, texts, labels, threshold):
+        """
+        Submit several chunks and wait for all their entities, in order.
+        """
+        futures = [self.submit(text, labels, threshold) for text in texts]
+        return [future.result() for future in futures]
+
+    def _next_batch(self):
+        # Called with the condition held; returns (key, items) to run, or the seconds to wait
+        now = time.monotonic()
+        next_deadline = None
+        for key, items in self.buckets.items():
+            deadline = items[0][3] + self.max_wait
+            if len(items) >= self.batch_size or deadline <= now or self.closed:
+                batch, self.buckets[key] = items[:self.batch_size], items[self.batch_size:]
+                if not self.buckets[key]:
+                    del self.buckets[key]
+                self.waiting -= len(batch)
+                return key, batch
+            if next_deadline is None or deadline < next_deadline:
+                next_deadline = deadline
+        return None if next_deadline is None else next_deadline - now
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while True:
+                    batch = self._next_batch()
+                    if isinstance(batch, tuple):
+                        break
+                    if batch is None and self.closed:
+                        return
+                    self.condition.wait(batch)
+            self._run_batch(*batch)
+
+    def _run_batch(self, key, items):
+        labels, threshold, _ = key
+        texts = [item[0] for item in items]
+        try:
+            predicted = self.model.batch_predict_entities(texts, list(labels), threshold=threshold)
+        except Exception as e:
+            self._fail_batch(key, items, e)
+            return
+        self._finish_batch(key, items, predicted)
+
+    def _fail_batch(self, key, items, error):
+        # A batch mixes chunks of several pages, so run its chunks one by one and fail only those that fail alone
+        if len(items) > 1:
+            for item in items:
+                self._run_batch(key, [item])
+            return
+        items[0][2].set_exception(error)
+
+    def _finish_batch(self, key, items, predicted):
+        labels, threshold, _ = key
+        error = None
+        try:
+            longest = max(item[1] for item in items)
+            with self.condition:
+                self.batches += 1
+                self.chunks += len(items)
+                self.words += sum(item[1] for item in items)
+                self.padded_words += longest * len(items)
+            for (text, _, future, _), entities in zip(items, predicted):
+                if self.cache is not None:
+                    self.cache.put(text, list(labels), threshold, entities)
+                future.set_result(entities)
+        except Exception as e:
+            error = e
+        finally:
+            # Every future is resolved, so no page waits forever on a chunk (a short result list, a failed cache write...)
+            for _, _, future, _ in items:
+                if not future.done():
+                    future.set_exception(error or RuntimeError(
+                        f"The model returned {len(predicted)} results for a batch of {len(items)} chunks"))
+
+    def queue_depth(self):
+        with self.condition:
+            return self.waiting
+
+    def stats(self):
+        """
+        Returns:
+            dict: batches run, chunks predicted, chunks waiting (queue_depth),
+            fill_ratio (average share of batch_size used) and padding_ratio
+            (share of each batch that is padding).
+        """
+        with self.condition:
+            return {
+                "batches": self.batches,
+                "chunks": self.chunks,
+                "queue_depth": self.waiting,
+                "fill_ratio": self.chunks / (self.batches * self.batch_size) if self.batches else 0.0,
+                "padding_ratio": 1 - self.words / self.padded_words if self.padded_words else 0.0,
+            }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"NER scheduler: {stats['chunks']} chunks in {stats['batches']} batches, "
+              f"{stats['fill_ratio']:.0%} batch fill, {stats['padding_ratio']:.0%} padding")
+
+    def close(self):
+        """
+        Run every chunk still waiting, then stop the scheduler thread.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
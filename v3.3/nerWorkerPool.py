@@ -0,0 +1,143 @@
+import gc
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from nerScheduler import NERScheduler
+
+# The workers are forked so they share the parent's weights; Windows (and some macOS builds) cannot fork
+FORK_AVAILABLE = "fork" in multiprocessing.get_all_start_methods()
+
+# Model of the worker processes, set once when each worker starts
+_worker_model = None
+
+
+# Function run in each worker when it starts: keep the model and limit it to the worker's share of the cores
+def _init_worker(model, threads):
+    global _worker_model
+    # Chunks are already spread over the workers; tokenizer threads would only compete with them
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    if getattr(model, "backend", "torch") == "torch":
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    else:
+        # ONNX Runtime does not follow torch's setting; the session is created with this many threads
+        model.threads = threads
+    # A forked worker shares the weights loaded by the parent; an ONNX session is loaded here, per worker
+    model.load()
+    _worker_model = model
+
+
+# Function run once in each worker by the warm-up, so every worker is started up front
+def _worker_ready():
+    return os.getpid()
+
+
+# Function run in a worker for each batch of chunks
+def _predict_batch(texts, labels, threshold):
+    return _worker_model.batch_predict_entities(texts, labels, threshold=threshold)
+
+
+class NERWorkerPool(NERScheduler):
+    """
+    NERScheduler whose batches run in a pool of worker processes instead
+    of its own thread, so the model runs on several batches at once. The
+    torch model is loaded once in this process before the workers are
+    forked, and they share its weights copy-on-write rather than each
+    loading a copy. With the ONNX backend the model is exported here once
+    and each worker opens its own session. Each worker is pinned to
+    `threads_per_worker` torch (or ONNX Runtime) threads, so the workers
+    together use the cores without oversubscribing them. Chunks are
+    submitted and cached exactly as with NERScheduler.
+
+    Create the pool before any other thread is started and before the
+    model has run in this process: the workers are all forked here, and
+    forking a process that has other threads (or torch's thread pool)
+    running can leave the workers stuck. Needs the "fork" start method,
+    see FORK_AVAILABLE. If a worker dies, the chunks of its batch and of
+    every later batch fail with BrokenProcessPool instead of waiting.
+    """
+
+    def __init__(self, model, workers=None, threads_per_worker=None, batch_size=8, max_wait=0.05,
+                 bucket_width=32, cache=None):
+        """
+        Args:
+            model (NERModel): Model handle; loaded here for the torch backend.
+            workers (int): Number of worker processes (default: one per core).
+            threads_per_worker (int): Model threads of each worker (default: the cores divided among the workers).
+            batch_size, max_wait, bucket_width, cache: See NERScheduler.
+        """
+        if not FORK_AVAILABLE:
+            raise RuntimeError("The NER worker pool needs the 'fork' start method, which this platform does not have")
+        cores = os.cpu_count() or 1
+        self.workers = workers or cores
+        self.threads_per_worker = threads_per_worker or max(1, cores // self.workers)
+        if getattr(model, "backend", "torch") == "torch":
+            model.load()
+            model.model.eval()
+        else:
+            # ONNX Runtime sessions are not safe to fork, so each worker loads its own; the model is
+            # exported here once, rather than by every worker at the same time
+            model.prepare()
+        # Objects that exist before the fork are never collected, so the collector does not write to their shared pages
+        gc.freeze()
+        try:
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork"),
+                                                initializer=_init_worker, initargs=(model, self.threads_per_worker))
+            # The executor forks its workers on the first submit; do it now, while this is the only thread
+            self.executor.submit(_worker_ready).result()
+        finally:
+            gc.unfreeze()
+        self.in_flight = 0
+        self.idle = threading.Condition()
+        super().__init__(model, batch_size, max_wait, bucket_width, cache)
+
+    def _run_batch(self, key, items):
+        labels, threshold, _ = key
+        # Plain strings pickle smaller than Chunk objects, and the workers only need the text
+        texts = [str(item[0]) for item in items]
+        with self.idle:
+            self.in_flight += 1
+        try:
+            future = self.executor.submit(_predict_batch, texts, list(labels), threshold)
+        except Exception as e:  # BrokenProcessPool once a worker has died
+            self._done(key, items, e)
+            return
+        future.add_done_callback(lambda future: self._done(key, items, future.exception(), future))
+
+    def _done(self, key, items, error, future=None):
+        # Runs in the executor's management thread; a failed batch is sent again chunk by chunk from here
+        try:
+            if error is None:
+                self._finish_batch(key, items, future.result())
+            else:
+                self._fail_batch(key, items, error)
+        finally:
+            with self.idle:
+                self.in_flight -= 1
+                self.idle.notify_all()
+
+    def stats(self):
+        """
+        Returns:
+            dict: NERScheduler.stats, with workers, threads_per_worker and
+            in_flight (batches sent to the workers and not yet back).
+        """
+        stats = super().stats()
+        with self.idle:
+            stats.update(workers=self.workers, threads_per_worker=self.threads_per_worker, in_flight=self.in_flight)
+        return stats
+
+    def print_stats(self):
+        super().print_stats()
+        print(f"NER worker pool: {self.workers} workers with {self.threads_per_worker} thread(s) each")
+
+    def close(self):
+        """
+        Run every chunk still waiting, wait for the workers to return them, then stop the workers.
+        """
+        super().close()
+        with self.idle:
+            self.idle.wait_for(lambda: self.in_flight == 0)
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+
+ONNX_FILE = "model.onnx"
+QUANTIZED_FILE = "model_quantized.onnx"
+
+# Short text and labels used to trace the model when exporting it
+TRACE_TEXT = "Jewad Selim was born in Ankara in 1919 and worked in Baghdad."
+TRACE_LABELS = ["Person", "City", "Date"]
+
+
+# Function to name the ONNX file of an exported model
+def exported_path(directory, quantize=False):
+    return os.path.join(directory, QUANTIZED_FILE if quantize else ONNX_FILE)
+
+
+# Function to export a GLiNER model to ONNX, and optionally quantize it to int8
+def export_onnx(model_name, directory, quantize=False):
+    """
+    Save the model's config and tokenizer to `directory`, export its
+    network to model.onnx and, with `quantize`, write a copy with int8
+    weights (dynamic quantization) to model_quantized.onnx.
+
+    Args:
+        model_name (str): Name of the model on the Hugging Face hub, or a local folder.
+        directory (str): Folder to write the exported model to.
+        quantize (bool): Also write the int8 model.
+
+    Returns:
+        str: Path of the ONNX file to load.
+    """
+    import torch
+    from gliner import GLiNER
+
+    os.makedirs(directory, exist_ok=True)
+    onnx_path = exported_path(directory)
+    if not os.path.exists(onnx_path):
+        print(f"Exporting {model_name} to {onnx_path}...")
+        gliner_model = GLiNER.from_pretrained(model_name)
+        gliner_model.save_pretrained(directory)
+        inputs, _ = gliner_model.prepare_model_inputs([TRACE_TEXT], TRACE_LABELS)
+        input_names = ["input_ids", "attention_mask", "words_mask", "text_lengths"]
+        dynamic_axes = {
+            "input_ids": {0: "batch_size", 1: "sequence_length"},
+            "attention_mask": {0: "batch_size", 1: "sequence_length"},
+            "words_mask": {0: "batch_size", 1: "sequence_length"},
+            "text_lengths": {0: "batch_size", 1: "value"},
+            "logits": {0: "position", 1: "batch_size", 2: "sequence_length", 3: "num_classes"},
+        }
+        # Span models also take the candidate spans; token models do not
+        if gliner_model.config.span_mode != "token_level":
+            input_names += ["span_idx", "span_mask"]
+            dynamic_axes["span_idx"] = {0: "batch_size", 1: "num_spans", 2: "idx"}
+            dynamic_axes["span_mask"] = {0: "batch_size", 1: "num_spans"}
+        torch.onnx.export(
+            gliner_model.model,
+            tuple(inputs[name] for name in input_names),
+            f=onnx_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+
+    if not quantize:
+        return onnx_path
+    quantized_path = exported_path(directory, quantize=True)
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        print(f"Quantizing {onnx_path} to int8...")
+        quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QUInt8)
+    return quantized_path
+
+
+# Function to export the model in a separate process, so the calling process never starts torch's thread pools
+def export_onnx_in_subprocess(model_name, directory, quantize=False):
+    if os.path.exists(exported_path(directory, quantize)):
+        return
+    process = multiprocessing.get_context("spawn").Process(target=export_onnx, args=(model_name, directory, quantize),
+                                                            name="onnx-export")
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"Exporting {model_name} to ONNX failed (exit code {process.exitcode})")
+
+
+# Function to load a GLiNER model that runs through ONNX Runtime, exporting it first if needed
+def load_onnx_model(model_name, directory, quantize=False, threads=None):
+    """
+    Args:
+        threads (int): Threads of the ONNX Runtime session (default: one per core).
+    """
+    try:
+        import onnxruntime
+    except ImportError:
+        raise RuntimeError("The ONNX backend needs onnxruntime; install it with 'pip install onnxruntime onnx'.")
+    from gliner import GLiNER
+
+    onnx_path = export_onnx(model_name, directory, quantize)
+    session_options = None
+    if threads:
+        # ONNX Runtime has its own thread pools; torch.set_num_threads does not limit them
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        session_options.inter_op_num_threads = 1
+    return GLiNER.from_pretrained(directory, load_onnx_model=True, load_tokenizer=True,
+                                  onnx_model_file=os.path.basename(onnx_path), session_options=session_options)
@@ -0,0 +1,155 @@
+import json
+import mmap
+import os
+import threading
+import time
+import zlib
+from crawlFrontier import canonicalize_url
+from pageStore import StoredPage
+
+try:
+    import zstandard
+except ImportError:  # zlib is used when zstandard is not installed
+    zstandard = None
+
+
+class PageArchive:
+    """
+    Append-only archive of raw page bodies. Bodies are compressed (zstd,
+    or zlib when zstandard is missing) and appended to one pack file, and
+    a line per page (URL, offset, length, fetch time, status, codec) is
+    appended to an index file next to it. Reads go through mmap.
+
+    It has the same get/put/release methods as PageStore, so an archive
+    can be passed as the page store to re-process pages with no network.
+    """
+
+    def __init__(self, path, level=3):
+        """
+        Args:
+            path (str): The pack file; the index is written to path + ".idx".
+            level (int): Compression level.
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        self.lock = threading.Lock()
+        self.index = {}  # canonical URL -> latest index entry
+        self.codec = "zstd" if zstandard else "zlib"
+        self.level = level
+        self.compressor = zstandard.ZstdCompressor(level=level) if zstandard else None
+        self.pack_file = open(path, "ab")
+        self.index_file = open(self.index_path, "a", encoding="utf-8")
+        self.mapped = None
+        self.mapped_size = 0
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as index_file:
+                for line in index_file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.index[entry["url"]] = entry
+
+    def _compress(self, content):
+        if self.codec == "zstd":
+            return self.compressor.compress(content)
+        return zlib.compress(content, self.level)
+
+    def _decompress(self, data, codec):
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("This archive entry is zstd-compressed; install zstandard to read it.")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def add(self, url, content, status=200, encoding=None, fetched_at=None):
+        """
+        Append one page body to the archive.
+        """
+        url = canonicalize_url(url)
+        data = self._compress(content)
+        with self.lock:
+            self.pack_file.seek(0, os.SEEK_END)
+            offset = self.pack_file.tell()
+            self.pack_file.write(data)
+            self.pack_file.flush()
+            entry = {
+                "url": url,
+                "offset": offset,
+                "length": len(data),
+                "fetched_at": fetched_at or time.time(),
+                "status": status,
+                "encoding": encoding,
+                "codec": self.codec,
+            }
+            self.index_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.index_file.flush()
+            self.index[url] = entry
+
+    def record_response(self, url, response):
+        """
+        Response listener for fetcher.add_response_listener: archives every
+        downloaded page that has a body.
+        """
+        if response.status_code != 304 and response.content:
+            self.add(url, response.content, response.status_code, response.encoding)
+
+    def read(self, url):
+        """
+        Return the raw body last archived for a URL, or None.
+        """
+        with self.lock:
+            entry = self.index.get(canonicalize_url(url))
+            if entry is None:
+                return None
+            end = entry["offset"] + entry["length"]
+            # Map the pack again when it has grown past what is mapped
+            if self.mapped is None or end > self.mapped_size:
+                if self.mapped is not None:
+                    self.mapped.close()
+                with open(self.path, "rb") as pack_file:
+                    self.mapped = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.mapped_size = len(self.mapped)
+            data = self.mapped[entry["offset"]:end]
+        return self._decompress(data, entry["codec"])
+
+    def entries(self):
+        """
+        Return the index entry of every archived URL (latest fetch only).
+        """
+        with self.lock:
+            return list(self.index.values())
+
+    # PageStore-compatible methods
+
+    def get(self, url):
+        entry = self.index.get(canonicalize_url(url))
+        if entry is None or entry["status"] != 200:
+            return None
+        return StoredPage(entry["url"], self.read(url), entry.get("encoding"))
+
+    def conditional_headers(self, url):
+        # Archived pages are served as they are (get), never revalidated
+        return {}
+
+    def revalidate(self, url):
+        return self.get(url)
+
+    def put(self, url, response):
+        self.record_response(url, response)
+
+    def release(self, url):
+        pass
+
+    def __contains__(self, url):
+        return canonicalize_url(url) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def close(self):
+        with self.lock:
+            if self.mapped is not None:
+                self.mapped.close()
+                self.mapped = None
+            self.pack_file.close()
+            self.index_file.close()
@@ -0,0 +1,191 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from crawlFrontier import canonicalize_url
+
+# Bytes of page bodies kept in memory before the oldest are dropped
+DEFAULT_MAX_MEMORY = 256 * 1024 * 1024
+
+
+class StoredPage:
+    """
+    A page body kept in the PageStore. It has the same attributes the
+    project reads from a requests Response (status_code, content, text,
+    headers), so it can be used in place of one.
+    """
+
+    def __init__(self, url, content, encoding, etag=None, last_modified=None):
+        self.url = url
+        self.status_code = 200
+        self.content = content
+        self.encoding = encoding
+        self.headers = {}
+        if etag:
+            self.headers["ETag"] = etag
+        if last_modified:
+            self.headers["Last-Modified"] = last_modified
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+class PageStore:
+    """
+    Content-addressed store of downloaded pages keyed by canonical URL.
+    The crawler writes the bio pages it downloads, and the extractor reads
+    them back instead of downloading every page a second time.
+
+    Bodies are kept in memory, or under `directory` (one file per SHA-256
+    of the body, plus an SQLite index) when a directory is given. In
+    memory, at most `max_memory` bytes of bodies are kept: the oldest are
+    dropped first, and the extractor downloads those pages again. Only
+    pages written during this run are served by get(); a page kept from an
+    earlier run may have changed since, so it is first revalidated with a
+    conditional GET (conditional_headers() and revalidate()).
+    """
+
+    def __init__(self, directory=None, max_memory=DEFAULT_MAX_MEMORY):
+        """
+        Args:
+            directory (str): Folder to keep the pages in, across runs (default: in memory).
+            max_memory (int): Bytes of bodies kept in memory, or None for no limit.
+        """
+        self.directory = directory
+        self.max_memory = max_memory
+        self.lock = threading.Lock()
+        self.index = {}  # canonical URL -> (body hash, encoding, etag, last_modified)
+        self.bodies = OrderedDict()  # body hash -> body, oldest first (memory mode only)
+        self.memory = 0  # Bytes of the bodies in memory
+        self.evicted = 0  # Bodies dropped to stay under max_memory
+        self.references = {}  # body hash -> number of URLs pointing at it
+        self.current = set()  # Canonical URLs written or revalidated during this run
+        self.connection = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, hash TEXT, encoding TEXT, etag TEXT, last_modified TEXT)"
+            )
+            self.connection.commit()
+            for url, body_hash, encoding, etag, last_modified in self.connection.execute("SELECT * FROM pages"):
+                self.index[url] = (body_hash, encoding, etag, last_modified)
+                self.references[body_hash] = self.references.get(body_hash, 0) + 1
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.directory, body_hash[:2], body_hash)
+
+    def put(self, url, response):
+        """
+        Save the body of a downloaded page under its canonical URL.
+        """
+        url = canonicalize_url(url)
+        content = response.content
+        body_hash = hashlib.sha256(content).hexdigest()
+        entry = (body_hash, response.encoding, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+        with self.lock:
+            self._forget(url)
+            self.index[url] = entry
+            self.current.add(url)
+            self.references[body_hash] = self.references.get(body_hash, 0) + 1
+            if self.directory:
+                path = self._body_path(body_hash)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "wb") as body_file:
+                        body_file.write(content)
+                self.connection.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)", (url,) + entry)
+                self.connection.commit()
+            elif body_hash not in self.bodies:
+                self.bodies[body_hash] = content
+                self.memory += len(content)
+                self._evict()
+
+    def _evict(self):
+        # Called with the lock held; the newest body is always kept
+        while self.max_memory is not None and self.memory > self.max_memory and len(self.bodies) > 1:
+            _, content = self.bodies.popitem(last=False)
+            self.memory -= len(content)
+            self.evicted += 1
+
+    def get(self, url):
+        """
+        Return the page stored for a URL during this run as a StoredPage, or None.
+        """
+        url = canonicalize_url(url)
+        with self.lock:
+            entry = self.index.get(url)
+            if entry is None or url not in self.current:
+                return None
+            body_hash, encoding, etag, last_modified = entry
+            if self.directory:
+                try:
+                    with open(self._body_path(body_hash), "rb") as body_file:
+                        content = body_file.read()
+                except FileNotFoundError:
+                    return None
+            else:
+                content = self.bodies.get(body_hash)
+                if content is None:
+                    return None
+        return StoredPage(url, content, encoding, etag, last_modified)
+
+    def conditional_headers(self, url):
+        """
+        Return the If-None-Match / If-Modified-Since headers of a page kept
+        from an earlier run, or {} when there is none (or it has no validators).
+        """
+        url = canonicalize_url(url)
+        with self.lock:
+            entry = self.index.get(url)
+        if entry is None or url in self.current:
+            return {}
+        headers = {}
+        if entry[2]:
+            headers["If-None-Match"] = entry[2]
+        if entry[3]:
+            headers["If-Modified-Since"] = entry[3]
+        return headers
+
+    def revalidate(self, url):
+        """
+        Serve a page kept from an earlier run again, once the server answered
+        304 to its conditional headers. Returns the StoredPage, or None.
+        """
+        url = canonicalize_url(url)
+        with self.lock:
+            if url in self.index:
+                self.current.add(url)
+        return self.get(url)
+
+    def release(self, url):
+        """
+        Drop an in-memory page once it has been processed. Pages stored
+        in a directory are kept for later runs.
+        """
+        if self.directory:
+            return
+        with self.lock:
+            self._forget(canonicalize_url(url))
+
+    def _forget(self, url):
+        entry = self.index.pop(url, None)
+        self.current.discard(url)
+        if entry is None:
+            return
+        body_hash = entry[0]
+        self.references[body_hash] -= 1
+        if self.references[body_hash] <= 0:
+            del self.references[body_hash]
+            content = self.bodies.pop(body_hash, None)
+            if content is not None:
+                self.memory -= len(content)
+
+    def __contains__(self, url):
+        return canonicalize_url(url) in self.index
+
+    def __len__(self):
+        return len(self.index)
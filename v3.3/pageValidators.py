@@ -0,0 +1,114 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+
+class PageNotModified(Exception):
+    """Raised when a page has not changed since it was last processed."""
+
+
+class ValidatorStore:
+    """
+    Per-URL HTTP validators (ETag, Last-Modified and a hash of the body)
+    saved in SQLite, used to send conditional GET requests on the next run.
+
+    Validators are kept separately for each stage ("crawl" and "extract"),
+    because the crawler and the extractor download the same bio pages.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): The SQLite file used to store the validators.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.pending = {}  # Validators waiting for the page to be fully processed
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT, stage TEXT, etag TEXT, last_modified TEXT, content_hash TEXT, links TEXT,
+                PRIMARY KEY (url, stage)
+            )
+        """)
+        self.connection.commit()
+
+    def _row(self, url, stage):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT etag, last_modified, content_hash, links FROM validators WHERE url = ? AND stage = ?",
+                (url, stage),
+            ).fetchone()
+
+    def conditional_headers(self, url, stage):
+        """
+        Return the If-None-Match / If-Modified-Since headers for a URL.
+        """
+        row = self._row(url, stage)
+        headers = {}
+        if row:
+            etag, last_modified = row[0], row[1]
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def is_unchanged(self, url, stage, response):
+        """
+        Check whether a response says the page did not change: either a 304,
+        or a 200 whose body hashes to the same value as last time.
+        """
+        if response.status_code == 304:
+            return True
+        row = self._row(url, stage)
+        return bool(row and row[2] and row[2] == hashlib.sha256(response.content).hexdigest())
+
+    def saved_links(self, url, stage):
+        """
+        Return the links extracted from the page the last time it was parsed.
+        """
+        row = self._row(url, stage)
+        return json.loads(row[3]) if row and row[3] else []
+
+    def save(self, url, stage, response, links=None):
+        """
+        Save the validators of a response right away.
+        """
+        self._write(url, stage, self._validators(response, links))
+
+    def hold(self, url, stage, response):
+        """
+        Keep the validators of a response aside until confirm() is called,
+        so a page that fails later in the pipeline is fetched again next run.
+        """
+        with self.lock:
+            self.pending[(url, stage)] = self._validators(response, None)
+
+    def confirm(self, url, stage):
+        with self.lock:
+            validators = self.pending.pop((url, stage), None)
+        if validators:
+            self._write(url, stage, validators)
+
+    def _validators(self, response, links):
+        return (
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            hashlib.sha256(response.content).hexdigest(),
+            json.dumps(links) if links is not None else None,
+        )
+
+    def _write(self, url, stage, validators):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO validators (url, stage, etag, last_modified, content_hash, links) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, stage) + validators,
+            )
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,72 @@
+import queue
+import threading
+import traceback
+
+_CRAWL_DONE = object()
+
+
+# Function to run a crawl in the background and yield bio URLs as soon as they are found
+def stream_bio_urls(crawl_function, base_url, website_type, url_path, max_queued=0, budget=None):
+    """
+    Run the crawl in a background thread and hand its bio URLs to the caller
+    while it is still crawling, so extraction and NER can start right away.
+
+    Args:
+        crawl_function (callable): Any crawl that accepts an `on_bio_url`
+            callback, e.g. crawl_and_extract_links or discover_bio_urls.
+        base_url (str): The page the crawl starts from.
+        website_type (int): 1 for Collection, 2 for Encyclopedia.
+        url_path (str): Path fragment that marks the links to follow.
+        max_queued (int): Pause the crawl once this many bio URLs wait to be
+            processed (0 means no limit).
+        budget (CrawlBudget): The budget `crawl_function` runs with. Closing
+            the generator before the crawl is done stops it through this
+            budget, so it ends (and saves its checkpoint) as if it had run out.
+
+    Yields:
+        str: Each bio URL, in the order the crawl found it.
+
+    Close the generator (e.g. after leaving the loop early) before closing
+    anything the crawl uses: closing waits for the crawl thread to end.
+    """
+    bio_url_queue = queue.Queue(maxsize=max_queued)
+    found = {"count": 0}
+    stopped = threading.Event()
+
+    def on_bio_url(bio_url):
+        found["count"] += 1
+        if not stopped.is_set():
+            bio_url_queue.put(bio_url)
+
+    def produce():
+        try:
+            crawl_function(base_url, website_type, url_path, on_bio_url=on_bio_url)
+        except Exception as e:
+            print(f"An error occurred while crawling {base_url}: {e}")
+            traceback.print_exc()
+        finally:
+            bio_url_queue.put(_CRAWL_DONE)
+
+    crawler = threading.Thread(target=produce, name="crawler", daemon=True)
+    crawler.start()
+
+    try:
+        while True:
+            bio_url = bio_url_queue.get()
+            if bio_url is _CRAWL_DONE:
+                break
+            yield bio_url
+    finally:
+        if crawler.is_alive():
+            print("Stopping the crawl...")
+            stopped.set()
+            if budget is not None:
+                budget.stop("processing stopped")
+            # Keep the queue empty so a crawl paused on a full queue can reach its end
+            while crawler.is_alive():
+                try:
+                    bio_url_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        crawler.join()
+    print(f"Crawling finished. Found {found['count']} bio pages.")
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+# Status codes that mean the server wants us to slow down
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+# Function to turn a Retry-After header (seconds or HTTP date) into seconds to wait
+def parse_retry_after(value):
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateController:
+    """
+    AIMD (additive increase, multiplicative decrease) limit on the number of
+    requests in flight. The limit grows by `increase` after every `limit`
+    successful requests whose latency stays close to the usual latency,
+    and is multiplied by `decrease` on 429/503 responses, timeouts and
+    connection errors. Like TCP, it is decreased at most once per window:
+    only a request sent after the last decrease can lower the limit again,
+    so a burst of failures among the requests already in flight counts
+    once. A Retry-After header pauses all new requests.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=32, increase=1, decrease=0.5, latency_tolerance=2.0):
+        """
+        Args:
+            initial (int): Number of requests allowed in flight at the start.
+            minimum (int): The limit never drops below this.
+            maximum (int): The limit never grows above this.
+            increase (int): Added to the limit after a full window of good requests.
+            decrease (float): The limit is multiplied by this when the server pushes back.
+            latency_tolerance (float): A request counts as "stable" while its latency
+                is below this many times the running average latency.
+        """
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.average_latency = None
+        self.good_in_window = 0
+        self.paused_until = 0.0
+        self.decreased_at = None  # When the limit was last lowered
+        self.throttled = 0
+        self.errors = 0
+        self.completed = 0
+        self.condition = None
+
+    def _get_condition(self):
+        # Created lazily so the controller can be built outside the event loop
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+        return self.condition
+
+    @property
+    def current_limit(self):
+        return int(self.limit)
+
+    async def acquire(self):
+        condition = self._get_condition()
+        while True:
+            # Honour a Retry-After pause before taking a slot
+            wait = self.paused_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            async with condition:
+                if self.in_flight < self.current_limit:
+                    self.in_flight += 1
+                    return
+                await condition.wait()
+
+    async def release(self):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    def record_success(self, latency):
+        """
+        Record a request that completed normally, with its latency in seconds.
+        """
+        self.completed += 1
+        if self.average_latency is None:
+            self.average_latency = latency
+        stable = latency <= self.average_latency * self.latency_tolerance
+        self.average_latency = 0.8 * self.average_latency + 0.2 * latency
+
+        if not stable:
+            self.good_in_window = 0
+            return
+        self.good_in_window += 1
+        if self.good_in_window >= self.current_limit and self.limit < self.maximum:
+            self.limit = min(self.maximum, self.limit + self.increase)
+            self.good_in_window = 0
+            print(f"Rate control: raising parallel requests to {self.current_limit}")
+
+    def record_throttle(self, retry_after=None, started=None):
+        """
+        Record a 429/503 response, pausing new requests for `retry_after` seconds if given.
+        `started` is the time.monotonic() the request was sent at.
+        """
+        self.throttled += 1
+        self._back_off("server asked us to slow down", started)
+        if retry_after:
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            print(f"Rate control: pausing new requests for {retry_after:.1f}s (Retry-After)")
+
+    def record_error(self, started=None):
+        """
+        Record a timeout or connection error. Other HTTP errors (404, 410...)
+        are answers from a healthy server: record them with record_success.
+        """
+        self.errors += 1
+        self._back_off("request failed", started)
+
+    def _back_off(self, reason, started=None):
+        if started is None:
+            # Without the send time, assume the request took the usual latency (one round trip)
+            started = time.monotonic() - (self.average_latency or 0.0)
+        # Requests sent before the last decrease were sent at the old rate; their failures are already accounted for
+        if self.decreased_at is not None and started < self.decreased_at:
+            return
+        self.decreased_at = time.monotonic()
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self.good_in_window = 0
+        print(f"Rate control: {reason}, lowering parallel requests to {self.current_limit}")
+
+    def stats(self):
+        return {
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "average_latency": self.average_latency,
+            "completed": self.completed,
+            "throttled": self.throttled,
+            "errors": self.errors,
+        }
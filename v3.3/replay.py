@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import fetcher
+from crawlFrontier import canonicalize_url
+
+# Response headers worth replaying; hop-by-hop and length headers are set by the server
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After", "Location", "Cache-Control")
+
+
+class ExchangeRecorder:
+    """
+    Records every HTTP exchange made through fetcher.fetch into a folder:
+    one JSON line per exchange in exchanges.jsonl, and each body once
+    under bodies/<sha256>.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+        self.log_file = open(os.path.join(directory, "exchanges.jsonl"), "a", encoding="utf-8")
+
+    def record_response(self, url, response):
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        body_path = os.path.join(self.directory, "bodies", body_hash)
+        exchange = {
+            "url": canonicalize_url(url),
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            "body": body_hash,
+            "recorded_at": time.time(),
+        }
+        with self.lock:
+            if not os.path.exists(body_path):
+                with open(body_path, "wb") as body_file:
+                    body_file.write(response.content)
+            self.log_file.write(json.dumps(exchange, ensure_ascii=False) + "\n")
+            self.log_file.flush()
+
+    def start(self):
+        fetcher.add_response_listener(self.record_response)
+        return self
+
+    def stop(self):
+        fetcher.remove_response_listener(self.record_response)
+        with self.lock:
+            self.log_file.close()
+
+
+# Function to load the recorded exchanges, keeping one per URL
+def load_exchanges(directory):
+    exchanges = {}
+    with open(os.path.join(directory, "exchanges.jsonl"), encoding="utf-8") as log_file:
+        for line in log_file:
+            if not line.strip():
+                continue
+            exchange = json.loads(line)
+            previous = exchanges.get(exchange["url"])
+            # A 304 has no body to replay, so keep the last full response instead
+            if previous is not None and exchange["status"] == 304 and previous["status"] != 304:
+                continue
+            exchanges[exchange["url"]] = exchange
+    return exchanges
+
+
+# Function to map an original URL onto the replay server: https://host/path -> http://server/https/host/path
+def replay_url(url, server_base):
+    parts = urlsplit(url)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    return f"{server_base}/{parts.scheme}/{parts.netloc}{target}"
+
+
+class ReplayServer:
+    """
+    Local HTTP server that answers with recorded exchanges, optionally
+    adding latency and random errors, so the pipeline can run offline and
+    its concurrent paths can be measured under controlled conditions.
+    """
+
+    def __init__(self, directory, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, seed=None):
+        """
+        Args:
+            directory (str): Folder written by ExchangeRecorder.
+            host (str): Address to listen on.
+            port (int): Port to listen on (0 picks a free port).
+            latency (float): Seconds added before every response.
+            jitter (float): Up to this many extra seconds, picked at random per response.
+            error_rate (float): Share of requests (0 to 1) answered with `error_status`.
+            error_status (int): Status code of the injected errors.
+            seed (int): Seed for the random latency and errors, for repeatable runs.
+        """
+        self.directory = directory
+        self.exchanges = load_exchanges(directory)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.served = 0
+        self.errors = 0
+        self.missing = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        replay = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Headers and body are written separately
+
+            def do_GET(self):
+                replay.handle(self)
+
+            def log_message(self, format, *args):
+                pass  # Keep the console for the pipeline's own output
+
+        return ReplayHandler
+
+    def handle(self, request):
+        # The path is /<scheme>/<host>/<original path and query>
+        scheme, _, rest = request.path.lstrip("/").partition("/")
+        host, _, target = rest.partition("/")
+        url = canonicalize_url(f"{scheme}://{host}/{target}")
+
+        exchange = self.exchanges.get(url)
+        with self.random_lock:
+            delay = self.latency + (self.random.random() * self.jitter if self.jitter else 0.0)
+            inject_error = self.error_rate and self.random.random() < self.error_rate
+            if inject_error:
+                self.errors += 1
+            elif exchange is None:
+                self.missing += 1
+            else:
+                self.served += 1
+        if delay:
+            time.sleep(delay)
+
+        if inject_error:
+            self._send(request, self.error_status, {"Retry-After": "1"}, b"")
+        elif exchange is None:
+            self._send(request, 404, {}, b"")
+        else:
+            with open(os.path.join(self.directory, "bodies", exchange["body"]), "rb") as body_file:
+                body = body_file.read()
+            self._send(request, exchange["status"], exchange["headers"], body)
+
+    def _send(self, request, status, headers, body):
+        request.send_response(status)
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def start(self):
+        """
+        Serve in a background thread and send every fetcher.fetch call here.
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, name="replay-server", daemon=True)
+        self.thread.start()
+        fetcher.set_url_rewriter(lambda url: replay_url(url, self.base_url))
+        print(f"Replaying {len(self.exchanges)} recorded pages from {self.base_url}")
+        return self
+
+    def stop(self):
+        fetcher.set_url_rewriter(None)
+        self.server.shutdown()
+        self.server.server_close()
+        print(f"Replay served {self.served} pages, {self.errors} injected errors, {self.missing} unknown URLs.")
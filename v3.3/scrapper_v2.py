@@ -1,101 +1,108 @@
-import requests
-from bs4 import BeautifulSoup
+from fetcher import fetch
 from finalMapping_v2 import is_it_a_nationality
 from finalMapping_v2 import is_arabic_country
 from finalWordCloud import generate_word_cloud
-from gliner import GLiNER
+from pageValidators import PageNotModified
+from htmlText import extract_between, response_encoding
+from extractionProfiles import get_profile, language_of
+from textChunker import chunk_text
+from nerBatching import predict_pages
+from nerModel import MODEL_NAME, NERModel
 import re
 import csv
 from collections import Counter
 import os
 
-# Initialize GLiNER with the base model
-model = GLiNER.from_pretrained("urchade/gliner_multi-v2.1")
+# Handle to GLiNER with the base model; the weights are loaded the first time it is used
+model = NERModel(MODEL_NAME)
+
+
+# Function to name the model and library version, so cached entities of another model are never reused
+def model_id():
+    return model.model_id
 
 # Predefined list of common pronouns (case-insensitive)
 pronoun_list = {"he", "she", "him", "her", "it", "they", "them", "we", "us", "i", "me", "you", "his", "their", "our"}
 
-# Define labels for entity prediction
-labels = ["Human", "Country", "Date", "Era", "Material"]
-labels2 = ["مادة", "عصر", "تاريخ", "دولة", "إنسان"]
-labels3 = ["Person", "Place", "City", "Country", "Date"]
-labels4 = ["مدينة", "مكان", "تاريخ", "دولة", "اسم"]
+# Labels for entity prediction are defined per site in extractionProfiles.PROFILES
 
-# Function to extract content between start and end phrases
-def fetch_main_content_advanced(url, start_phrase, end_phrase):
-    response = requests.get(url)
+# Function to extract content with the site's profile, or between start and end phrases
+def fetch_main_content_advanced(url, start_phrase, end_phrase, validators=None, page_store=None, timeout=None, profile=None,
+                                template=None):
+    # Reuse the page the crawler already downloaded, if it is in the store
+    response = page_store.get(url) if page_store is not None else None
+    if response is None:
+        # Send a conditional GET when we have validators from an earlier run
+        headers = validators.conditional_headers(url, "extract") if validators else {}
+        # A page kept in the store by an earlier run is only reused once the server confirms it has not changed
+        stored_headers = page_store.conditional_headers(url) if page_store is not None and not headers else {}
+        response = fetch(url, headers=headers or stored_headers, timeout=timeout)
+        if stored_headers and response.status_code == 304:
+            response = page_store.revalidate(url) or fetch(url, timeout=timeout)
+    if validators and validators.is_unchanged(url, "extract", response):
+        raise PageNotModified(f"{url} has not changed since the last run")
     if response.status_code == 200:
-        content = response.text
-        soup = BeautifulSoup(content, "html.parser")
-        clean_content = re.sub(r'<[^>]+>', ' ', str(soup))
-        # Find content between the specified phrases
-        start_index = clean_content.find(start_phrase)
-        end_index = clean_content.find(end_phrase, start_index)
-
-        if start_index != -1 and end_index != -1:
-            extracted_content = clean_content[start_index:end_index].strip()
-            return split_into_chunks(extracted_content)  # Return chunks
+        if validators:
+            # Saved only once the page has been fully processed
+            validators.hold(url, "extract", response)
+        encoding = response_encoding(response)
+        extracted_content = None
+        if profile is not None:
+            extracted_content = profile.extract(response.content, encoding, language_of(url), template=template)
+        if extracted_content is None and start_phrase is not None:
+            # Find content between the specified phrases, parsing only up to the end phrase
+            if template is not None:
+                extracted_content = template.text_between(response.content, start_phrase, end_phrase, encoding)
+            else:
+                extracted_content = extract_between(response.content, start_phrase, end_phrase, encoding)
+        if extracted_content is None and start_phrase is None and template is not None:
+            # Keep whatever the site does not repeat on every page
+            extracted_content = template.main_text(response.content, encoding) or None
+
+        if extracted_content is not None:
+            return split_into_chunks(extracted_content.strip())  # Return chunks
+        elif profile is not None and start_phrase is None:
+            raise ValueError(f"Content not found with the '{profile.name}' extraction profile.")
         else:
             raise ValueError("Specified phrases not found in the content.")
     else:
         raise Exception(f"Failed to fetch {url}, status code: {response.status_code}")
 
-# Function to split content into word-safe chunks
-def split_into_chunks(content, chunk_size=500):
-    words = content.split()
-    chunks = []
-    current_chunk = []
-
-    for word in words:
-        if len(" ".join(current_chunk + [word])) > chunk_size:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = [word]
-        else:
-            current_chunk.append(word)
-
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
+# Function to split content into chunks that fit GLiNER's word budget, with their offsets in the content
+def split_into_chunks(content, max_tokens=None, overlap=0, sentences=True):
+    return chunk_text(content, max_tokens or model.config.max_len, overlap, sentences)
 
-    return chunks
+# Function to pick the label set and threshold for a page's site and language
+def entity_settings(bio_url, website_type):
+    profile = get_profile(website_type)
+    language = language_of(bio_url)
+    if profile is None or language is None:
+        raise ValueError("Language not recognized. URL must contain '/en/' or '/ar/'.")
+    return language, profile.labels[language], profile.thresholds[language]
 
 # Function to extract entities from biography content
-def extract_entities(biography_content, bio_url, website_type):
+def extract_entities(biography_content, bio_url, website_type, cache=None, predicted=None):
     """
     Extract entities from the content based on the language specified in the URL.
+    Chunks found in `cache` (an NERCache) are not run through the model again,
+    and the model is not run at all when `predicted` (the raw entities of the
+    chunks, e.g. from a batched run) is given.
     """
-    all_entities = []
     print(bio_url)
 
-    if website_type == 2:
-        if "/en/" in bio_url.lower():
-            print("Language: English")
-            language = "English"
-            current_labels = labels3  # Set for website_type 2 and /en/ in URL
-            threshold = 0.5
-        elif "/ar/" in bio_url.lower():
-            print("Language: Arabic")
-            language = "Arabic"
-            current_labels = labels4  # Set for website_type 2 and /ar/ in URL
-            threshold = 0.6
-
-    elif website_type == 1:
-        if "/en/" in bio_url.lower():
-            print("Language: English")
-            language = "English"
-            current_labels = labels  # Set for website_type 1 and /en/ in URL
-            threshold = 0.5
-        elif "/ar/" in bio_url.lower():
-            print("Language: Arabic")
-            language = "Arabic"
-            current_labels = labels2  # Set for website_type 1 and /ar/ in URL
-            threshold = 0.6
+    language, current_labels, threshold = entity_settings(bio_url, website_type)
+    print(f"Language: {language}")
 
+    if predicted is not None:
+        all_entities = list(predicted)
     else:
-        raise ValueError("Language not recognized. URL must contain '/en/' or '/ar/'.")
-
-    for chunk in biography_content:
-        entities = model.predict_entities(chunk, current_labels, threshold)
-        all_entities.extend(entities)
+        all_entities = []
+        for chunk in biography_content:
+            if cache is not None:
+                entities = cache.predict(model, chunk, current_labels, threshold)
+            else:
+                entities = model.predict_entities(chunk, current_labels, threshold=threshold)
+            all_entities.extend(entities)
 
     arabic_pattern = re.compile(r'[\u0600-\u06FF]')
     human_names = set()
@@ -185,9 +192,9 @@ def extract_entities(biography_content, bio_url, website_type):
     return sorted_human_names, sorted_countries, sorted_dates, sorted_places, sorted_cities
 
 # Function to process content and save results
-def process_bio_page(bio_url, biography_content, folder_name, website_type):
+def process_bio_page(bio_url, biography_content, folder_name, website_type, cache=None, predicted=None):
     os.makedirs(folder_name, exist_ok=True)
-    human_names, countries, dates, places, cities = extract_entities(biography_content, bio_url, website_type)
+    human_names, countries, dates, places, cities = extract_entities(biography_content, bio_url, website_type, cache, predicted)
 
     entity_label_counts = Counter()
     all_entities_set = set(human_names).union(set(countries), set(dates), set(places), set(cities))
@@ -215,3 +222,72 @@ def process_bio_page(bio_url, biography_content, folder_name, website_type):
         print("Word cloud has been saved.")
     else:
         print("Failed to generate word cloud.")'''
+
+# Function to process several pages, running the model on their chunks in batches
+def process_bio_pages(pages, folder_name, website_type, cache=None, batch_size=8, scheduler=None):
+    """
+    Args:
+        pages (list): (bio_url, chunks) for each page.
+        folder_name (str): Folder the results are written to.
+        website_type (int): 1 for Collection, 2 for Encyclopedia.
+        cache (NERCache): Cache of entities already predicted.
+        batch_size (int): Number of chunks per forward pass.
+        scheduler (NERScheduler): Length-bucketing scheduler to send the chunks through.
+
+    Returns:
+        dict: bio_url -> the exception raised while processing it, for the pages that failed.
+    """
+    errors = {}
+    batch = []
+    for bio_url, chunks in pages:
+        try:
+            _, current_labels, threshold = entity_settings(bio_url, website_type)
+            batch.append((bio_url, chunks, current_labels, threshold))
+        except Exception as e:
+            errors[bio_url] = e
+
+    try:
+        predicted = predict_pages(model, batch, batch_size, cache, scheduler)
+    except Exception:
+        # A failed batch should cost only the pages that fail: try each page on its own
+        predicted = {}
+        for page in batch:
+            try:
+                predicted.update(predict_pages(model, [page], batch_size, cache, scheduler))
+            except Exception as e:
+                errors[page[0]] = e
+    for bio_url, chunks, _, _ in batch:
+        if bio_url in errors:
+            continue
+        try:
+            process_bio_page(bio_url, chunks, folder_name, website_type, predicted=predicted[bio_url])
+        except Exception as e:
+            errors[bio_url] = e
+    return errors
+
+# Function to queue the chunks of a page on a scheduler without waiting for their entities
+def submit_bio_page(bio_url, chunks, website_type, scheduler):
+    """
+    Returns:
+        list: One Future per chunk, resolving to the chunk's entities.
+    """
+    _, current_labels, threshold = entity_settings(bio_url, website_type)
+    return [scheduler.submit(chunk, current_labels, threshold) for chunk in chunks]
+
+# Function to write the results of pages submitted with submit_bio_page, waiting for their entities if needed
+def finish_bio_pages(pages, folder_name, website_type):
+    """
+    Args:
+        pages (list): (bio_url, chunks, futures) for each page.
+
+    Returns:
+        dict: bio_url -> the exception raised while processing it, for the pages that failed.
+    """
+    errors = {}
+    for bio_url, chunks, futures in pages:
+        try:
+            predicted = [entity for future in futures for entity in future.result()]
+            process_bio_page(bio_url, chunks, folder_name, website_type, predicted=predicted)
+        except Exception as e:
+            errors[bio_url] = e
+    return errors
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import math
+from collections import Counter
+from htmlText import PhraseWindow, VisibleTextParser, decoded_blocks, response_encoding
+from fetcher import fetch
+
+# Tags that start a new block of text
+BLOCK_TAGS = frozenset((
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "footer", "form", "h1", "h2", "h3",
+    "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "td", "th", "title",
+    "tr", "ul",
+))
+
+
+class BlockParser(VisibleTextParser):
+    """
+    Streaming parser that splits the visible text of a page into blocks,
+    one per paragraph, list item, cell, heading and so on, with the
+    whitespace collapsed.
+    """
+
+    def __init__(self):
+        self.pieces = []
+        self.blocks = []
+        super().__init__(self.pieces.append)
+
+    def flush(self):
+        text = " ".join("".join(self.pieces).split())
+        self.pieces.clear()
+        if text:
+            self.blocks.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.flush()
+        super().handle_starttag(tag, attrs)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.flush()
+        super().handle_startendtag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in BLOCK_TAGS:
+            self.flush()
+        super().handle_endtag(tag)
+
+    def close(self):
+        super().close()
+        self.flush()
+
+
+# Function to split a page into its blocks of visible text
+def page_blocks(content, encoding="utf-8"):
+    parser = BlockParser()
+    for block in decoded_blocks(content, encoding):
+        parser.feed(block)
+    parser.close()
+    return parser.blocks
+
+
+# Function to hash a block of text into a 64-bit fingerprint
+def block_fingerprint(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class SiteTemplate:
+    """
+    The text blocks a site repeats on its pages (navigation, footer,
+    sidebar, share buttons...), learned once from a sample of pages and
+    then stripped from every other page with one hash lookup per block.
+    """
+
+    def __init__(self, min_share=0.5, fingerprints=None, sample_count=0):
+        """
+        Args:
+            min_share (float): Share of the sampled pages (0 to 1) a block must
+                appear on to count as part of the template.
+            fingerprints (iterable): Fingerprints of already learned blocks.
+            sample_count (int): Number of pages the template was learned from.
+        """
+        self.min_share = min_share
+        self.fingerprints = set(fingerprints or ())
+        self.sample_count = sample_count
+
+    def learn(self, pages):
+        """
+        Learn the template from the blocks of sampled pages.
+
+        Args:
+            pages (list): One list of text blocks (see page_blocks) per page.
+        """
+        counts = Counter()
+        for blocks in pages:
+            counts.update({block_fingerprint(block) for block in blocks})
+        self.sample_count = len(pages)
+        # A block seen on a single page is never boilerplate, whatever the sample size
+        needed = max(2, math.ceil(self.min_share * self.sample_count))
+        self.fingerprints = {fingerprint for fingerprint, count in counts.items() if count >= needed}
+        return self
+
+    def is_boilerplate(self, block):
+        return block_fingerprint(block) in self.fingerprints
+
+    def strip(self, blocks):
+        """
+        Return the blocks that are not part of the template, in page order.
+        """
+        return [block for block in blocks if block_fingerprint(block) not in self.fingerprints]
+
+    def main_text(self, content, encoding="utf-8"):
+        """
+        Return the text of a page without the template blocks, one block per line.
+        """
+        return "\n".join(self.strip(page_blocks(content, encoding)))
+
+    def text_between(self, content, start_phrase, end_phrase, encoding="utf-8", block_size=65536):
+        """
+        Return the text between two phrases like htmlText.extract_between,
+        one block per line, with the template blocks left out. Blocks that
+        hold a phrase are kept even when the site repeats them (a section
+        heading, say), so the window can still be found.
+        """
+        window = PhraseWindow(start_phrase, end_phrase)
+        parser = BlockParser()
+        for block in decoded_blocks(content, encoding, block_size):
+            parser.feed(block)
+            self._add_blocks(window, parser.blocks, start_phrase, end_phrase)
+            if window.done:
+                return window.result
+        parser.close()
+        self._add_blocks(window, parser.blocks, start_phrase, end_phrase)
+        return window.result
+
+    def _add_blocks(self, window, blocks, start_phrase, end_phrase):
+        for block in blocks:
+            if start_phrase in block or end_phrase in block or not self.is_boilerplate(block):
+                window.add(block + "\n")
+        blocks.clear()
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as template_file:
+            json.dump({
+                "min_share": self.min_share,
+                "sample_count": self.sample_count,
+                "fingerprints": sorted(f"{fingerprint:016x}" for fingerprint in self.fingerprints),
+            }, template_file)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as template_file:
+            data = json.load(template_file)
+        return cls(data["min_share"], (int(fingerprint, 16) for fingerprint in data["fingerprints"]), data["sample_count"])
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+
+# Function to learn a site's template from a sample of its pages
+def learn_site_template(urls, page_store=None, timeout=None, min_share=0.5):
+    """
+    Args:
+        urls (list): Pages of the site to learn from (10-20 is usually enough).
+        page_store (PageStore): Store to read already downloaded pages from.
+        timeout (tuple): (connect, read) timeout for pages that are downloaded.
+        min_share (float): See SiteTemplate.
+
+    Returns:
+        SiteTemplate: The learned template.
+    """
+    pages = []
+    for url in urls:
+        response = page_store.get(url) if page_store is not None else None
+        if response is None:
+            try:
+                response = fetch(url, timeout=timeout)
+            except Exception as e:
+                print(f"Skipping {url} while learning the site template: {e}")
+                continue
+        if response.status_code == 200:
+            pages.append(page_blocks(response.content, response_encoding(response)))
+    template = SiteTemplate(min_share).learn(pages)
+    print(f"Learned {len(template)} repeated text blocks from {template.sample_count} pages.")
+    return template
@@ -0,0 +1,115 @@
+import gzip
+import requests
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
+from fetcher import fetch
+from crawlFrontier import canonicalize_url
+from finalCrawling import crawl_and_extract_links, crawl_page, is_bio_url, resolve_url_path
+
+
+# Function to list the sitemaps a site advertises, plus the usual default location
+def find_sitemaps(base_url, timeout=None):
+    sitemaps = []
+    try:
+        response = fetch(urljoin(base_url, "/robots.txt"), timeout=timeout)
+        if response.status_code == 200:
+            for line in response.text.splitlines():
+                if line.lower().startswith("sitemap:"):
+                    sitemaps.append(line.split(":", 1)[1].strip())
+    except requests.exceptions.RequestException as e:
+        print(f"Error reading robots.txt for {base_url}: {e}")
+
+    default_sitemap = urljoin(base_url, "/sitemap.xml")
+    if default_sitemap not in sitemaps:
+        sitemaps.append(default_sitemap)
+    return sitemaps
+
+
+# Function to read a sitemap (or sitemap index) and return every page URL it lists
+def read_sitemap(sitemap_url, seen_sitemaps=None, timeout=None):
+    seen_sitemaps = set() if seen_sitemaps is None else seen_sitemaps
+    if sitemap_url in seen_sitemaps:
+        return []
+    seen_sitemaps.add(sitemap_url)
+
+    try:
+        response = fetch(sitemap_url, timeout=timeout)
+        if response.status_code != 200:
+            return []
+        content = response.content
+        if sitemap_url.endswith(".gz") or content[:2] == b"\x1f\x8b":
+            content = gzip.decompress(content)
+        root = ET.fromstring(content)
+    except (requests.exceptions.RequestException, ET.ParseError, OSError) as e:
+        print(f"Error reading sitemap {sitemap_url}: {e}")
+        return []
+
+    page_urls = []
+    # Tags carry the sitemap namespace, so only compare the local name
+    for loc in root.iter():
+        if not loc.tag.endswith("loc") or not loc.text:
+            continue
+        location = loc.text.strip()
+        if root.tag.endswith("sitemapindex"):
+            page_urls.extend(read_sitemap(location, seen_sitemaps, timeout))
+        else:
+            page_urls.append(location)
+    return page_urls
+
+
+# Function to find bio URLs from sitemaps and listing pages, crawling only to fill the gaps
+def discover_bio_urls(base_url, website_type, url_path, listing_pages=None, fill_gaps=True, crawl_function=None, on_bio_url=None,
+                      timeout=None):
+    """
+    Enumerate bio/object pages without walking the whole site.
+
+    Args:
+        base_url (str): The site to discover pages on.
+        website_type (int): 1 for Collection, 2 for Encyclopedia.
+        url_path (str): Path fragment that marks the target pages.
+        listing_pages (list): Optional index pages whose links are read directly.
+        fill_gaps (bool): Run a crawl afterwards to find pages the sitemaps missed.
+        crawl_function (callable): The crawl used for the gaps, called as
+            crawl_function(base_url, website_type, url_path, known_urls=...).
+            Defaults to crawl_and_extract_links.
+        on_bio_url (callable): Optional callback called once with each bio URL returned.
+        timeout (tuple): (connect, read) timeout of the sitemap and listing page downloads.
+
+    Returns:
+        list: The bio URLs found.
+    """
+    url_path = resolve_url_path(website_type, url_path)
+    bio_urls = []
+    found = set()
+
+    def add(url):
+        # Sitemaps may spell a page differently from the crawl (host case, query order, fragment)
+        try:
+            url = canonicalize_url(url)
+        except ValueError:  # A malformed entry, e.g. a port that is not a number
+            return
+        if is_bio_url(url, url_path) and url not in found:
+            found.add(url)
+            bio_urls.append(url)
+
+    for sitemap_url in find_sitemaps(base_url, timeout):
+        for page_url in read_sitemap(sitemap_url, timeout=timeout):
+            add(page_url)
+    print(f"Sitemaps listed {len(bio_urls)} bio pages.")
+
+    for listing_url in listing_pages or []:
+        for page_url in crawl_page(listing_url, set(), url_path, timeout=timeout):
+            add(page_url)
+    if listing_pages:
+        print(f"Sitemaps and listing pages listed {len(bio_urls)} bio pages.")
+
+    if not bio_urls:
+        print("Nothing found in sitemaps or listing pages, falling back to a full crawl.")
+    elif not fill_gaps:
+        for bio_url in bio_urls if on_bio_url else []:
+            on_bio_url(bio_url)
+        return bio_urls
+
+    crawl_function = crawl_function or crawl_and_extract_links
+    # Known bio pages are not downloaded again; the crawl only looks for missing ones
+    return crawl_function(base_url, website_type, url_path, known_urls=bio_urls, on_bio_url=on_bio_url)
@@ -0,0 +1,41 @@
+import finalCrawling
+from crawlBudget import CrawlBudget
+from crawlCheckpoint import CrawlCheckpoint
+
+# A chain of listing pages: each links to the next one and to one bio page
+CHAIN = {f"https://a.org/list/{n}": [f"https://a.org/list/{n + 1}", f"https://a.org/bios/Pages/{n}.aspx"] for n in range(10)}
+
+
+def fetch_chain(url, visited_urls, url_path, *args):
+    return [link for link in CHAIN.get(url, []) if link not in visited_urls]
+
+
+def test_frontier_depth_is_saved_and_restored(tmp_path):
+    path = str(tmp_path / "crawl.sqlite")
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.load("https://a.org/")
+    checkpoint.record_page("https://a.org/", ["https://a.org/list/0"], False, depth=0)
+    checkpoint.record_page("https://a.org/list/0", ["https://a.org/list/1"], False, depth=1)
+    checkpoint.close()
+
+    visited_urls, urls_to_visit, bio_urls = CrawlCheckpoint(path).load("https://a.org/")
+    assert visited_urls == {"https://a.org/", "https://a.org/list/0"}
+    assert urls_to_visit == [("https://a.org/list/1", 2)]
+
+
+def test_resumed_crawl_keeps_to_the_maximum_depth(tmp_path, monkeypatch):
+    monkeypatch.setattr(finalCrawling, "fetch_page_links", fetch_chain)
+    path = str(tmp_path / "crawl.sqlite")
+    start = "https://a.org/list/0"
+
+    # Interrupted after two pages, then resumed with the same depth limit
+    first = finalCrawling.crawl_and_extract_links(start, 3, "/bios/Pages/", checkpoint_path=path,
+                                                  budget=CrawlBudget(max_pages=2, max_depth=3))
+    rest = finalCrawling.crawl_and_extract_links(start, 3, "/bios/Pages/", checkpoint_path=path,
+                                                 budget=CrawlBudget(max_depth=3))
+
+    # list/0 and list/1 were crawled first; depth 3 is list/3 and the bio page of list/2, nothing deeper is crawled
+    assert first == []
+    assert sorted(rest) == [f"https://a.org/bios/Pages/{n}.aspx" for n in range(3)]
+    visited_urls, urls_to_visit, _ = CrawlCheckpoint(path).load(start)
+    assert "https://a.org/list/4" not in visited_urls and urls_to_visit == []
@@ -0,0 +1,35 @@
+import pytest
+import finalCrawling
+
+# A small site: the start page links to 3 listing pages, each linking to 2 bio pages
+SITE = {"https://a.org/": [f"https://a.org/list/{n}" for n in range(3)]}
+for _n in range(3):
+    SITE[f"https://a.org/list/{_n}"] = [f"https://a.org/bios/Pages/{_n}-{m}.aspx" for m in range(2)]
+
+
+def fetch_site(url, visited_urls, url_path, *args):
+    return [link for link in SITE.get(url, []) if link not in visited_urls]
+
+
+def test_concurrent_crawl_finds_every_bio_page(monkeypatch):
+    monkeypatch.setattr(finalCrawling, "fetch_page_links", fetch_site)
+    bio_urls = finalCrawling.crawl_and_extract_links_concurrent("https://a.org/", 3, "/bios/Pages/", concurrency=4)
+    assert sorted(bio_urls) == sorted(link for n in range(3) for link in SITE[f"https://a.org/list/{n}"])
+
+
+def test_concurrent_crawl_raises_an_error_of_on_bio_url_instead_of_hanging(monkeypatch):
+    monkeypatch.setattr(finalCrawling, "fetch_page_links", fetch_site)
+
+    def on_bio_url(url):
+        raise RuntimeError("cannot queue " + url)
+
+    with pytest.raises(RuntimeError, match="cannot queue"):
+        finalCrawling.crawl_and_extract_links_concurrent("https://a.org/", 3, "/bios/Pages/", concurrency=4, on_bio_url=on_bio_url)
+
+
+def test_malformed_links_are_skipped():
+    content = (b'<a href="https://x.org:80a/en/bios/Pages/a.aspx">bad port</a>'
+               b'<a href="http://[x.org/en/bios/Pages/b.aspx">bad host</a>'
+               b'<a href="/en/bios/Pages/c.aspx">good</a>')
+    assert finalCrawling.extract_links("https://x.org/en/", content, set(), "/bios/Pages/") == [
+        "https://x.org/en/bios/Pages/c.aspx"]
@@ -0,0 +1,58 @@
+import pytest
+from nerScheduler import NERScheduler
+
+
+class StubModel:
+    """Tags every chunk with one entity, and fails every batch holding a chunk that contains "bad"."""
+
+    def __init__(self, short=False):
+        self.short = short
+        self.calls = []
+
+    def batch_predict_entities(self, texts, labels, threshold=0.5):
+        self.calls.append(list(texts))
+        if any("bad" in text for text in texts):
+            raise ValueError("cannot tag " + ", ".join(texts))
+        predicted = [[{"text": text, "label": labels[0]}] for text in texts]
+        return predicted[:-1] if self.short else predicted
+
+
+class FailingCache:
+    def get(self, text, labels, threshold):
+        return None
+
+    def put(self, text, labels, threshold, entities):
+        raise OSError("disk full")
+
+
+def test_a_failed_batch_fails_only_the_chunks_that_fail_alone():
+    model = StubModel()
+    scheduler = NERScheduler(model, batch_size=4, max_wait=10)
+    futures = [scheduler.submit(text, ["Person"], 0.5) for text in ["page 1", "page 2 bad", "page 3", "page 4"]]
+    scheduler.close()
+
+    assert model.calls[0] == ["page 1", "page 2 bad", "page 3", "page 4"]
+    assert [future.result()[0]["text"] for future in futures if not future.exception()] == ["page 1", "page 3", "page 4"]
+    with pytest.raises(ValueError, match="page 2 bad$"):
+        futures[1].result()
+
+
+def test_a_short_result_list_fails_the_chunks_left_without_entities():
+    scheduler = NERScheduler(StubModel(short=True), batch_size=2, max_wait=10)
+    futures = [scheduler.submit(text, ["Person"], 0.5) for text in ["page 1", "page 2"]]
+    scheduler.close()
+
+    assert futures[0].result()[0]["text"] == "page 1"
+    with pytest.raises(RuntimeError, match="1 results for a batch of 2"):
+        futures[1].result(timeout=1)
+
+
+def test_a_failed_cache_write_fails_the_batch_and_keeps_the_scheduler_running():
+    scheduler = NERScheduler(StubModel(), batch_size=2, max_wait=10, cache=FailingCache())
+    futures = [scheduler.submit(text, ["Person"], 0.5) for text in ["page 1", "page 2"]]
+    later = [scheduler.submit(text, ["Person"], 0.5) for text in ["page 3", "page 4"]]
+    scheduler.close()
+
+    for future in futures + later:
+        with pytest.raises(OSError):
+            future.result(timeout=1)
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+import fetcher
+from pageArchive import PageArchive
+
+
+class StubFetcher:
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        return SimpleNamespace(status_code=200, content=f"<html>{url}</html>".encode(), encoding="utf-8")
+
+
+def test_new_archive_records_downloads_and_reads_them_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "get_fetcher", lambda: StubFetcher())
+    path = str(tmp_path / "pages.pack")
+    archive = PageArchive(path)
+    assert len(archive) == 0  # A new archive is falsy, so callers must compare it with None
+
+    fetcher.add_response_listener(archive.record_response)
+    try:
+        fetcher.fetch("https://a.org/bios/Pages/1.aspx")
+        fetcher.fetch("https://a.org/bios/Pages/2.aspx")
+    finally:
+        fetcher.remove_response_listener(archive.record_response)
+    archive.close()
+
+    archive = PageArchive(path)
+    assert len(archive) == 2
+    page = archive.get("https://a.org/bios/Pages/1.aspx")
+    assert page.content == b"<html>https://a.org/bios/Pages/1.aspx</html>"
+    assert archive.read("https://a.org/bios/Pages/2.aspx") == b"<html>https://a.org/bios/Pages/2.aspx</html>"
+    archive.close()
+
+
+def test_not_modified_responses_are_not_archived(tmp_path):
+    archive = PageArchive(str(tmp_path / "pages.pack"))
+    archive.record_response("https://a.org/", SimpleNamespace(status_code=304, content=b"", encoding=None))
+    assert len(archive) == 0
+    archive.close()
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+import finalCrawling
+from pageStore import PageStore
+
+
+def response(content):
+    return SimpleNamespace(status_code=200, content=content, encoding="utf-8", headers={})
+
+
+def test_memory_store_drops_the_oldest_bodies_past_its_limit():
+    page_store = PageStore(max_memory=25)
+    for n in range(4):
+        page_store.put(f"https://a.org/bios/Pages/{n}.aspx", response(b"%d" % n * 10))
+
+    assert page_store.memory <= 25 and page_store.evicted == 2
+    assert page_store.get("https://a.org/bios/Pages/0.aspx") is None  # Downloaded again by the extractor
+    assert page_store.get("https://a.org/bios/Pages/3.aspx").content == b"3" * 10
+
+    page_store.release("https://a.org/bios/Pages/0.aspx")
+    page_store.release("https://a.org/bios/Pages/3.aspx")
+    assert page_store.memory == 10
+
+
+def test_unchanged_bio_page_is_still_kept_for_the_extractor(monkeypatch):
+    class UnchangedValidators:
+        def conditional_headers(self, url, stage):
+            return {}
+
+        def is_unchanged(self, url, stage, response):
+            return True  # A server without ETag answered 200 with the same body
+
+        def saved_links(self, url, stage):
+            return []
+
+    monkeypatch.setattr(finalCrawling, "fetch", lambda url, headers=None, timeout=None: response(b"<p>bio</p>"))
+    page_store = PageStore()
+    url = "https://a.org/bios/Pages/1.aspx"
+    assert finalCrawling.fetch_page_links(url, set(), "/bios/Pages/", UnchangedValidators(), page_store) == []
+    assert page_store.get(url).content == b"<p>bio</p>"
@@ -0,0 +1,24 @@
+from htmlText import extract_between
+from siteTemplate import SiteTemplate, page_blocks
+
+
+def page(name, text):
+    return (f"<html><body><nav><a href='/'>Home</a> <a href='/bios'>Artists</a></nav>"
+            f"<h1>{name}</h1><h2>Biography</h2><p>Share this page</p><p>{text}</p>"
+            f"<h2>Exhibitions</h2><footer>Qatar Museums</footer></body></html>")
+
+
+PAGES = [page(f"Artist {n}", f"Artist {n} was born in {1900 + n}.") for n in range(4)]
+
+
+def test_text_between_leaves_out_the_template_but_keeps_the_phrases():
+    template = SiteTemplate().learn([page_blocks(content) for content in PAGES])
+    assert "Share this page" in extract_between(PAGES[0], "Biography", "Exhibitions")
+
+    text = template.text_between(PAGES[0], "Biography", "Exhibitions")
+    assert text == "Biography\nArtist 0 was born in 1900.\n"
+
+
+def test_text_between_is_none_when_a_phrase_is_missing():
+    template = SiteTemplate().learn([page_blocks(content) for content in PAGES])
+    assert template.text_between(PAGES[0], "Biography", "Collections") is None
@@ -0,0 +1,85 @@
+import threading
+import pytest
+import distributedCrawl
+from workQueue import InMemoryWorkQueue, RedisWorkQueue, SQLiteWorkQueue
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def work_queue(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryWorkQueue()
+    if request.param == "sqlite":
+        return SQLiteWorkQueue(str(tmp_path / "queue.sqlite"))
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis needs it to run the Lua scripts
+    return RedisWorkQueue(fakeredis.FakeRedis(decode_responses=True))
+
+
+def test_push_ignores_urls_already_seen(work_queue):
+    assert work_queue.push(["https://a/1", "https://a/2"]) == 2
+    assert work_queue.push(["https://a/2", "https://a/3"]) == 1
+
+
+def test_lease_hands_out_each_url_once_in_order(work_queue):
+    work_queue.push(["https://a/1", "https://a/2"])
+    assert work_queue.lease("w1", 60) == "https://a/1"
+    assert work_queue.lease("w2", 60) == "https://a/2"
+    assert work_queue.lease("w1", 60) is None
+
+
+def test_expired_lease_is_requeued(work_queue):
+    work_queue.push(["https://a/1", "https://a/2"])
+    assert work_queue.lease("w1", -1) == "https://a/1"  # Expired as soon as it is taken
+    assert work_queue.lease("w2", 60) == "https://a/2"
+    assert work_queue.requeue_expired() == 1
+    assert work_queue.lease("w3", 60) == "https://a/1"
+    assert work_queue.requeue_expired() == 0
+
+
+def test_done_only_once_every_lease_is_completed(work_queue):
+    work_queue.push(["https://a/1"])
+    url = work_queue.lease("w1", 60)
+    assert not work_queue.is_done()  # Nothing queued, but a page is still leased
+
+    work_queue.complete(url, ["https://a/2", "https://a/1"], is_bio=False)
+    assert not work_queue.is_done()
+    url = work_queue.lease("w1", 60)
+    assert url == "https://a/2"
+
+    work_queue.complete(url, [], is_bio=True)
+    assert work_queue.is_done()
+    assert work_queue.bio_urls() == ["https://a/2"]
+
+
+def test_mark_known_records_bio_urls_without_queuing_them(work_queue):
+    work_queue.mark_known(["https://a/bio"])
+    assert work_queue.push(["https://a/bio"]) == 0
+    assert work_queue.is_done()
+    assert work_queue.bio_urls() == ["https://a/bio"]
+
+
+def test_workers_crawl_every_page_once_and_stop(monkeypatch):
+    # A small site: the start page links to 10 listing pages, each linking to 3 bio pages
+    links = {"https://a/": [f"https://a/list/{n}" for n in range(10)]}
+    for n in range(10):
+        links[f"https://a/list/{n}"] = [f"https://a/bios/Pages/{n}-{m}" for m in range(3)]
+    crawled = []
+
+    def crawl_page(url, visited_urls, url_path, *args):
+        crawled.append(url)
+        return links.get(url, [])
+
+    monkeypatch.setattr(distributedCrawl, "crawl_page", crawl_page)
+    work_queue = InMemoryWorkQueue()
+    work_queue.push(["https://a/"])
+    workers = [threading.Thread(target=distributedCrawl.run_crawl_worker,
+                                args=(work_queue, 2, "/bios/Pages/"), kwargs={"worker_id": f"w{n}", "idle_wait": 0.01})
+               for n in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert not any(worker.is_alive() for worker in workers)
+    assert sorted(crawled) == sorted(set(crawled)) and len(crawled) == 41
+    assert len(work_queue.bio_urls()) == 30
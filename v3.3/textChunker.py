@@ -0,0 +1,68 @@
+import re
+
+# The pattern GLiNER's WhitespaceTokenSplitter uses to split text into the words it counts
+WORD_PATTERN = re.compile(r"\w+(?:[-_]\w+)*|\S")
+
+# Punctuation that ends a sentence (Latin and Arabic); the splitter makes each one a word of its own
+SENTENCE_END = frozenset(".!?؟")
+
+# Number of words GLiNER reads from one text (config.max_len of gliner_multi-v2.1)
+DEFAULT_MAX_TOKENS = 384
+
+
+class Chunk(str):
+    """
+    A piece of a longer text. It is a plain string (so it can be passed
+    to the model and searched as before) that also remembers where it
+    starts and ends in the source text, and how many words it holds.
+    """
+
+    def __new__(cls, text, start, end, token_count):
+        chunk = super().__new__(cls, text)
+        chunk.start = start
+        chunk.end = end
+        chunk.token_count = token_count
+        return chunk
+
+
+# Function to split a text into chunks that fit the model's word budget
+def chunk_text(text, max_tokens=DEFAULT_MAX_TOKENS, overlap=0, sentences=True):
+    """
+    Pack the words of a text greedily into chunks of at most `max_tokens`
+    words, counted the way GLiNER counts them. Runs in time linear in the
+    length of the text.
+
+    Args:
+        text (str): The text to split.
+        max_tokens (int): Maximum number of words per chunk.
+        overlap (int): Number of words repeated at the start of the next chunk,
+            so entities on a chunk border are seen whole at least once.
+        sentences (bool): End chunks at the last sentence end that fits,
+            when there is one; a sentence longer than a chunk is still cut.
+
+    Returns:
+        list: Chunk strings, with their character offsets into `text`.
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be at least 1")
+    overlap = max(0, min(overlap, max_tokens - 1))
+
+    spans = [match.span() for match in WORD_PATTERN.finditer(text)]
+    chunks = []
+    word_count = len(spans)
+    first = 0
+    while first < word_count:
+        last = min(first + max_tokens, word_count)  # Exclusive
+        if sentences and last < word_count:
+            # Walk back to the last sentence end in this chunk; the walk never goes
+            # past the chunk's own words, so the whole split stays linear
+            for end in range(last, first + overlap, -1):
+                if text[spans[end - 1][0]] in SENTENCE_END:
+                    last = end
+                    break
+        start, stop = spans[first][0], spans[last - 1][1]
+        chunks.append(Chunk(text[start:stop], start, stop, last - first))
+        if last == word_count:
+            break
+        first = max(first + 1, last - overlap)
+    return chunks
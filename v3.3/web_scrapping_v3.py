@@ -1,52 +1,337 @@
+import argparse
+import importlib.util
+import os
 import traceback
-from scrapper_v2 import fetch_main_content_advanced, process_bio_page
-from finalCrawling import crawl_and_extract_links
+from functools import partial
+from itertools import chain, islice
+from scrapper_v2 import fetch_main_content_advanced, finish_bio_pages, model, model_id, process_bio_pages, submit_bio_page
+from finalCrawling import crawl_and_extract_links, crawl_and_extract_links_concurrent, is_bio_url, resolve_url_path
+from pageValidators import PageNotModified, ValidatorStore
+from pageStore import PageStore
+from pageArchive import PageArchive
+from replay import ExchangeRecorder, ReplayServer
+from sitemapDiscovery import discover_bio_urls
+from pipeline import stream_bio_urls
+import fetcher
+from rateControl import AdaptiveRateController
+from distributedCrawl import crawl_distributed
+from crawlBudget import CrawlBudget
+from extractionProfiles import get_profile
+from siteTemplate import SiteTemplate, learn_site_template
+from nerCache import NERCache
+from nerScheduler import NERScheduler
+from nerWorkerPool import FORK_AVAILABLE, NERWorkerPool
+
+
+# Function to read the options of a run from the command line
+def parse_args(argv=None):
+    """
+    Every option has a default. The website type, URL, crawl choice, path
+    and (for a profile not checked yet) phrases are asked for when they
+    are not given, as before, so a run with all of them needs no
+    interaction. Options can also be read from a file, one per line:
+        python web_scrapping_v3.py @options.txt
+    """
+    parser = argparse.ArgumentParser(description="Crawl a museum website and extract the entities of its bio pages.",
+                                     fromfile_prefix_chars="@")
+    site = parser.add_argument_group("site")
+    site.add_argument("--website-type", type=int, choices=[1, 2], help="1 for Collection, 2 for Encyclopedia")
+    site.add_argument("--url", help="Page the crawl starts from, or the single page to process")
+    site.add_argument("--crawl", action=argparse.BooleanOptionalAction, help="Crawl the whole website from --url")
+    site.add_argument("--path", help="Path fragment of the bio pages, e.g. /bios/Pages/")
+    site.add_argument("--start-phrase", help="Phrase the content starts after, instead of the site's extraction profile")
+    site.add_argument("--end-phrase", help="Phrase the content ends before")
+
+    traffic = parser.add_argument_group("recorded traffic")
+    traffic.add_argument("--record", metavar="FOLDER", help="Record every HTTP exchange to this folder")
+    traffic.add_argument("--replay", metavar="FOLDER", help="Replay a recording offline from a local server")
+    traffic.add_argument("--replay-latency", type=float, default=0, help="Added latency per replayed response, in seconds")
+    traffic.add_argument("--replay-error-rate", type=float, default=0, help="Share of replayed responses to fail with 503")
+
+    storage = parser.add_argument_group("stored pages")
+    storage.add_argument("--validators", metavar="FILE", help="Validator file, so unchanged pages are skipped on the next run")
+    storage.add_argument("--page-store", metavar="FOLDER", help="Folder to keep downloaded pages in (default: in memory)")
+    storage.add_argument("--page-store-memory", type=int, default=256, metavar="MB",
+                         help="Megabytes of pages kept in memory without --page-store; older pages are downloaded again")
+    storage.add_argument("--archive", metavar="FILE", help="Archive file for the raw HTML of every download")
+    storage.add_argument("--from-archive", action="store_true", help="Re-process the archived pages without downloading them")
+
+    crawl = parser.add_argument_group("crawl")
+    crawl.add_argument("--checkpoint", metavar="FILE", help="Checkpoint file to save and resume the crawl")
+    crawl.add_argument("--best-first", action="store_true", help="Crawl bio pages and productive listing pages first")
+    crawl.add_argument("--compact", choices=["fingerprint", "bloom"], help="Compact visited set for very large crawls")
+    crawl.add_argument("--max-pages", type=int, help="Maximum pages to crawl")
+    crawl.add_argument("--max-depth", type=int, help="Maximum link depth from the start page")
+    crawl.add_argument("--crawl-deadline", type=float, metavar="SECONDS", help="Time limit for the crawl")
+    crawl.add_argument("--connect-timeout", type=float, default=10, metavar="SECONDS",
+                       help="Seconds to wait for a connection, for every download")
+    crawl.add_argument("--read-timeout", type=float, default=30, metavar="SECONDS",
+                       help="Seconds to wait for the server between bytes, for every download")
+    crawl.add_argument("--queue", metavar="LOCATION", help="Shared crawl queue for worker processes (SQLite file or redis:// URL)")
+    crawl.add_argument("--crawl-workers", type=int, default=4, help="Local worker processes on the shared queue")
+    crawl.add_argument("--concurrency", type=int, default=1, help="Parallel requests (1 crawls one page at a time)")
+    crawl.add_argument("--per-host-limit", type=int, default=4, help="Maximum parallel requests per host")
+    crawl.add_argument("--adaptive", action="store_true", help="Adapt parallel requests to the server's responses")
+    crawl.add_argument("--sitemaps", action="store_true", help="Read sitemaps and listing pages before crawling")
+    crawl.add_argument("--listing-pages", nargs="*", default=[], metavar="URL", help="Listing pages to read links from")
+    crawl.add_argument("--fill-gaps", action=argparse.BooleanOptionalAction, default=True,
+                       help="Crawl for pages missing from the sitemaps")
+    crawl.add_argument("--stream", action="store_true", help="Process bio pages while the crawl is still running")
+
+    extraction = parser.add_argument_group("extraction")
+    extraction.add_argument("--template", metavar="FILE", help="Site template file to load, or to save once learned")
+    extraction.add_argument("--template-sample", type=int, metavar="PAGES", help="Pages to sample for learning the site template")
+
+    ner = parser.add_argument_group("entities")
+    ner.add_argument("--backend", choices=["torch", "onnx", "onnx-int8"], default="torch", help="How the model runs")
+    ner.add_argument("--ner-cache", metavar="FILE", help="NER cache file to reuse entities between runs")
+    ner.add_argument("--max-bio-pages", type=int, help="Maximum bio pages to process")
+    ner.add_argument("--processing-deadline", type=float, metavar="SECONDS", help="Time limit for processing")
+    ner.add_argument("--pages-per-batch", type=int,
+                     help="Pages to extract entities from together (default 1); with --max-wait or --ner-workers, "
+                          "pages fetched ahead of the model (default 32)")
+    ner.add_argument("--batch-size", type=int, default=8, help="Chunks per model call")
+    ner.add_argument("--max-wait", type=float, metavar="MS",
+                     help="Milliseconds a chunk may wait for a batch of similar length (default: batch in page order)")
+    # The worker pool forks its workers, which Windows cannot do
+    if FORK_AVAILABLE:
+        ner.add_argument("--ner-workers", type=int, help="Worker processes running the model (default: run it in this process)")
+        ner.add_argument("--threads-per-worker", type=int, help="Model threads of each worker (default: divide the cores)")
+    else:
+        parser.set_defaults(ner_workers=None, threads_per_worker=None)
+
+    args = parser.parse_args(argv)
+    if (args.start_phrase is None) != (args.end_phrase is None):
+        parser.error("--start-phrase and --end-phrase go together")
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be used together")
+    # Checked now rather than when the model is first used, after the whole crawl
+    if args.backend != "torch" and importlib.util.find_spec("onnxruntime") is None:
+        parser.error(f"--backend {args.backend} needs onnxruntime; install it with 'pip install onnxruntime onnx'")
+    return args
+
+
+# Function to confirm or report each processed page, then drop it from the page store
+def report_pages(bio_urls, errors, validators, page_store):
+    for bio_url in bio_urls:
+        error = errors.get(bio_url)
+        if error is not None:
+            print(f"An error occurred while processing {bio_url}: {error}")
+            traceback.print_exception(error)
+        elif validators:
+            validators.confirm(bio_url, "extract")
+        page_store.release(bio_url)
+
+
+# Function to extract the entities of the fetched pages in one batched run, then confirm or report each page
+def extract_pending(pending, folder_name, website_type, validators, page_store, ner_cache, batch_size):
+    print(f"\nExtracting entities from {len(pending)} page(s)...")
+    try:
+        errors = process_bio_pages(pending, folder_name, website_type, ner_cache, batch_size)
+    except Exception as e:
+        # Every page of the batch failed; they stay unconfirmed so the next run tries them again
+        errors = {bio_url: e for bio_url, _ in pending}
+    report_pages([bio_url for bio_url, _ in pending], errors, validators, page_store)
+    pending.clear()
+
+
+# Function to write the submitted pages whose entities are ready, waiting for the oldest ones beyond `keep`
+def finish_submitted(submitted, folder_name, website_type, validators, page_store, keep=0):
+    ready = [page for index, page in enumerate(submitted)
+             if index < len(submitted) - keep or all(future.done() for future in page[2])]
+    if not ready:
+        return
+    print(f"\nWriting the entities of {len(ready)} page(s)...")
+    errors = finish_bio_pages(ready, folder_name, website_type)
+    report_pages([bio_url for bio_url, _, _ in ready], errors, validators, page_store)
+    finished = {id(page) for page in ready}
+    submitted[:] = [page for page in submitted if id(page) not in finished]
 
 
 # Main script
 if __name__ == "__main__":
-    website_type = input("Please choose the type of website:\n1. Collection\n2. Encyclopedia\nEnter the number corresponding to your choice: ").strip()
+    args = parse_args()
 
-    # Ensure website_type is an integer
-    try:
-        website_type = int(website_type)
-    except ValueError:
-        print("Invalid input. Please enter a valid number (1 or 2).")
-        exit()
+    website_type = args.website_type
+    if website_type is None:
+        website_type = input("Please choose the type of website:\n1. Collection\n2. Encyclopedia\nEnter the number corresponding to your choice: ").strip()
 
-    crawl_first = input("Crawl whole website? T/F: ").strip().upper()
-    url = input("Enter the URL: ").strip()
+        # Ensure website_type is an integer
+        try:
+            website_type = int(website_type)
+        except ValueError:
+            print("Invalid input. Please enter a valid number (1 or 2).")
+            exit()
 
-    if crawl_first == 'T':
-        url_path = input("Enter specific path: ").strip()
-        bio_urls = crawl_and_extract_links(url, website_type, url_path)
-        print(f"Crawling finished. Found {len(bio_urls)} bio pages.")
+    if args.crawl is None:
+        crawl_first = input("Crawl whole website? T/F: ").strip().upper()
+    else:
+        crawl_first = 'T' if args.crawl else 'F'
+    url = args.url or input("Enter the URL: ").strip()
+
+    # The model can run through ONNX Runtime instead of torch, optionally with int8 weights
+    model.use_backend("onnx" if args.backend == "onnx-int8" else args.backend, quantize=args.backend == "onnx-int8")
+
+    # Entities of chunks already seen in an earlier run are read back instead of predicted again
+    ner_cache = NERCache(args.ner_cache, model_id()) if args.ner_cache else None
+
+    batch_size = args.batch_size
+    # Batches of chunks with about the same length waste little of each model call on padding
+    max_wait = args.max_wait
+    # Several processes can run the model at once, sharing the weights loaded here. They are forked now,
+    # before the recorder, the replay server or the crawl start any thread in this process
+    if args.ner_workers:
+        scheduler = NERWorkerPool(model, args.ner_workers, args.threads_per_worker,
+                                  batch_size, max_wait / 1000 if max_wait is not None else 0.05, cache=ner_cache)
+    else:
+        scheduler = NERScheduler(model, batch_size, max_wait / 1000, cache=ner_cache) if max_wait is not None else None
+
+    # Record every HTTP exchange, or replay a recording offline from a local server
+    recorder = ExchangeRecorder(args.record).start() if args.record else None
+    replay_server = None
+    if args.replay:
+        replay_server = ReplayServer(args.replay, latency=args.replay_latency, error_rate=args.replay_error_rate).start()
+
+    # Validators from earlier runs let unchanged pages be skipped
+    validators = ValidatorStore(args.validators) if args.validators else None
+
+    # Pages downloaded by the crawler are kept here so they are only fetched once
+    page_store = PageStore(args.page_store, max_memory=args.page_store_memory * 1024 * 1024)
+
+    # Raw HTML of every download can be archived, and an archive can be re-processed offline
+    archive = PageArchive(args.archive) if args.archive else None
+    # An empty archive has a length of 0, so it is compared with None rather than tested for truth
+    if archive is not None and len(archive) and args.from_archive:
+        page_store = archive
+    elif archive is not None:
+        fetcher.add_response_listener(archive.record_response)
+
+    crawl_stream = None  # Crawl running in the background while its bio pages are processed
+    if crawl_first == 'T' and page_store is archive:
+        # Take the bio pages straight from the archive instead of crawling again
+        url_path = resolve_url_path(website_type, args.path or input("Enter specific path: ").strip())
+        bio_urls = [entry["url"] for entry in archive.entries() if is_bio_url(entry["url"], url_path)]
+        print(f"Found {len(bio_urls)} archived bio pages.")
+    elif crawl_first == 'T':
+        url_path = args.path or input("Enter specific path: ").strip()
+        budget = CrawlBudget(max_pages=args.max_pages, max_depth=args.max_depth, deadline=args.crawl_deadline,
+                             connect_timeout=args.connect_timeout, read_timeout=args.read_timeout)
+        if args.queue:
+            crawl = partial(crawl_distributed, workers=args.crawl_workers, queue_location=args.queue)
+        elif args.concurrency > 1:
+            # Keep enough pooled connections alive for every parallel request
+            fetcher.configure(pool_maxsize=max(10, args.concurrency))
+            # Let the rate controller find how fast the server can go, up to --concurrency
+            rate_controller = AdaptiveRateController(maximum=args.concurrency) if args.adaptive else None
+            crawl = partial(crawl_and_extract_links_concurrent, concurrency=args.concurrency, per_host_limit=args.per_host_limit,
+                            checkpoint_path=args.checkpoint, validators=validators, compact=args.compact, page_store=page_store,
+                            rate_controller=rate_controller, best_first=args.best_first, budget=budget)
+        else:
+            crawl = partial(crawl_and_extract_links, checkpoint_path=args.checkpoint, validators=validators, compact=args.compact,
+                            page_store=page_store, best_first=args.best_first, budget=budget)
+
+        if args.sitemaps:
+            crawl = partial(discover_bio_urls, listing_pages=args.listing_pages, fill_gaps=args.fill_gaps, crawl_function=crawl,
+                            timeout=(args.connect_timeout, args.read_timeout))
+
+        # Streaming hands each bio page to extraction while the crawl is still running
+        if args.stream:
+            crawl_stream = bio_urls = stream_bio_urls(crawl, url, website_type, url_path, budget=budget)
+        else:
+            bio_urls = crawl(url, website_type, url_path)
+            print(f"Crawling finished. Found {len(bio_urls)} bio pages.")
     elif crawl_first == 'F':  
         bio_urls = [url]
 
-    # Assign the correct folder name based on website type
-    if website_type == 1:
-        folder_name = "QM Collections"
-    elif website_type == 2:
-        folder_name = "Mathaf Encyclopedia"
-    else:
+    # The site's extraction profile gives the folder name, where the content is, and the labels
+    profile = get_profile(website_type)
+    if profile is None:
         print("Invalid website type. Exiting.")
         exit()
+    folder_name = profile.folder_name
+
+    # Phrases override the profile, and are still needed for a profile not checked against the site yet
+    start_phrase, end_phrase = args.start_phrase, args.end_phrase
+    if start_phrase is None and not profile.verified:
+        print(f"The '{profile.name}' extraction profile has not been checked against the site yet.")
+        start_phrase = input("Enter the starting phrase: ").strip()
+        end_phrase = input("Enter the ending phrase: ").strip()
+
+    # Learn the text the site repeats on every page (menus, footer...) once, then strip it from every page
+    template = None
+    if args.template and os.path.exists(args.template):
+        template = SiteTemplate.load(args.template)
+        print(f"Loaded {len(template)} repeated text blocks from {args.template}.")
+    elif args.template_sample:
+        if isinstance(bio_urls, list):
+            sample = bio_urls[::max(1, len(bio_urls) // args.template_sample)][:args.template_sample]
+        else:
+            # Pages still being crawled: learn from the first ones, then process them with the rest
+            sample = list(islice(bio_urls, args.template_sample))
+            bio_urls = chain(sample, bio_urls)
+        template = learn_site_template(sample, page_store, timeout=(args.connect_timeout, args.read_timeout))
+        if args.template:
+            template.save(args.template)
 
-    # Enter the phrases for scraping content
-    start_phrase = input("Enter the starting phrase: ").strip()
-    end_phrase = input("Enter the ending phrase: ").strip()
+    # Limit how many pages are processed and for how long, keeping the results so far
+    processing_budget = CrawlBudget(max_pages=args.max_bio_pages, deadline=args.processing_deadline,
+                                    connect_timeout=args.connect_timeout, read_timeout=args.read_timeout)
+    processing_budget.start()
+
+    # Chunks of several pages can go through the model together. With a scheduler, each page's chunks are
+    # queued as soon as it is fetched and the loop moves on, so batches fill up from the pages that follow
+    pages_per_batch = args.pages_per_batch or (32 if scheduler else 1)
+    pending = []  # (bio_url, chunks) of the pages fetched but not yet through the model
+    submitted = []  # (bio_url, chunks, futures) of the pages whose chunks are queued on the scheduler
 
     # Process each bio page
     for bio_url in bio_urls:
+        if not processing_budget.allows_page():
+            break
+        processing_budget.count_page()
         try:
             print(f"\nFetching content for {bio_url}...")
-            chunks = fetch_main_content_advanced(bio_url, start_phrase, end_phrase)
+            chunks = fetch_main_content_advanced(bio_url, start_phrase, end_phrase, validators, page_store,
+                                                 processing_budget.request_timeout(),
+                                                 profile if start_phrase is None else None, template)
             print("Content fetched successfully!")
             print(chunks)
-            print("\nExtracting entities...")
-            process_bio_page(bio_url, chunks, folder_name, website_type)
-
+            if scheduler:
+                submitted.append((bio_url, chunks, submit_bio_page(bio_url, chunks, website_type, scheduler)))
+            else:
+                pending.append((bio_url, chunks))
+        except PageNotModified:
+            print(f"{bio_url} has not changed since the last run, skipping.")
+            page_store.release(bio_url)
         except Exception as e:
             print(f"An error occurred while processing {bio_url}: {e}")
             traceback.print_exc()
+            page_store.release(bio_url)
+
+        if scheduler:
+            # Only waits for the model when more than pages_per_batch pages are ahead of it
+            finish_submitted(submitted, folder_name, website_type, validators, page_store, keep=pages_per_batch)
+        elif len(pending) >= pages_per_batch:
+            extract_pending(pending, folder_name, website_type, validators, page_store, ner_cache, batch_size)
+    if pending:
+        extract_pending(pending, folder_name, website_type, validators, page_store, ner_cache, batch_size)
+    finish_submitted(submitted, folder_name, website_type, validators, page_store)
+    # A crawl still running (e.g. the processing budget ran out first) is stopped before what it uses is closed
+    if crawl_stream:
+        crawl_stream.close()
+
+    unprocessed = len(bio_urls) - processing_budget.pages if isinstance(bio_urls, list) else 0
+    processing_budget.report("Processing", f"{processing_budget.pages} bio pages handled", unprocessed)
+    fetcher.print_connection_stats()
+    if scheduler:
+        scheduler.close()
+        scheduler.print_stats()
+    if ner_cache:
+        ner_cache.print_stats()
+        ner_cache.close()
+    if archive is not None:
+        archive.close()
+    if recorder:
+        recorder.stop()
+    if replay_server:
+        replay_server.stop()
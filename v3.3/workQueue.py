@@ -0,0 +1,272 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# Lua scripts keep each Redis operation atomic when several workers share the queue
+_REDIS_PUSH = """
+local added = 0
+for _, url in ipairs(ARGV) do
+    if redis.call('SADD', KEYS[1], url) == 1 then
+        redis.call('RPUSH', KEYS[2], url)
+        added = added + 1
+    end
+end
+return added
+"""
+_REDIS_LEASE = """
+local url = redis.call('LPOP', KEYS[1])
+if not url then return false end
+redis.call('ZADD', KEYS[2], ARGV[1], url)
+return url
+"""
+# Releasing the lease and queuing the new links happen together, so no worker sees the crawl as done in between
+_REDIS_COMPLETE = """
+redis.call('ZREM', KEYS[3], ARGV[1])
+if ARGV[2] == '1' then
+    redis.call('ZADD', KEYS[4], 'NX', ARGV[3], ARGV[1])
+end
+local added = 0
+for i = 4, #ARGV do
+    if redis.call('SADD', KEYS[1], ARGV[i]) == 1 then
+        redis.call('RPUSH', KEYS[2], ARGV[i])
+        added = added + 1
+    end
+end
+return added
+"""
+_REDIS_REQUEUE = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, url in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], url)
+    redis.call('LPUSH', KEYS[1], url)
+end
+return #expired
+"""
+
+
+class InMemoryWorkQueue:
+    """
+    Work queue kept in this process only. Shared by threads, and used as a
+    stand-in for the SQLite and Redis queues in tests.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seen = set()
+        self.queued = deque()
+        self.leased = {}  # url -> lease expiry time
+        self.bio = []
+
+    def push(self, urls):
+        with self.lock:
+            return self._push(urls)
+
+    def _push(self, urls):
+        # Called with the lock held
+        added = 0
+        for url in urls:
+            if url not in self.seen:
+                self.seen.add(url)
+                self.queued.append(url)
+                added += 1
+        return added
+
+    def mark_known(self, urls):
+        with self.lock:
+            for url in urls:
+                self.seen.add(url)
+                if url not in self.bio:
+                    self.bio.append(url)
+
+    def lease(self, worker_id, lease_seconds):
+        with self.lock:
+            if not self.queued:
+                return None
+            url = self.queued.popleft()
+            self.leased[url] = time.time() + lease_seconds
+            return url
+
+    def complete(self, url, new_links, is_bio):
+        # The lease is released and the new links queued under one lock, like the SQLite transaction
+        with self.lock:
+            self.leased.pop(url, None)
+            if is_bio and url not in self.bio:
+                self.bio.append(url)
+            self._push(new_links)
+
+    def requeue_expired(self):
+        now = time.time()
+        with self.lock:
+            expired = [url for url, expires in self.leased.items() if expires < now]
+            for url in expired:
+                del self.leased[url]
+                self.queued.appendleft(url)
+            return len(expired)
+
+    def is_done(self):
+        with self.lock:
+            return not self.queued and not self.leased
+
+    def bio_urls(self):
+        with self.lock:
+            return list(self.bio)
+
+
+class SQLiteWorkQueue:
+    """
+    Work queue in an SQLite file, shared by worker processes on one machine
+    (or on several machines through a shared file system that supports locking).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE,
+                state TEXT DEFAULT 'queued', lease_expires REAL, worker TEXT
+            );
+            CREATE INDEX IF NOT EXISTS urls_state ON urls (state, id);
+            CREATE TABLE IF NOT EXISTS bio_urls (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE);
+        """)
+
+    def push(self, urls):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.connection.total_changes
+            self.connection.executemany("INSERT OR IGNORE INTO urls (url) VALUES (?)", [(url,) for url in urls])
+            added = self.connection.total_changes - before
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        return added
+
+    def mark_known(self, urls):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.executemany("INSERT OR IGNORE INTO urls (url, state) VALUES (?, 'done')", [(url,) for url in urls])
+            self.connection.executemany("INSERT OR IGNORE INTO bio_urls (url) VALUES (?)", [(url,) for url in urls])
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def lease(self, worker_id, lease_seconds):
+        # BEGIN IMMEDIATE takes the write lock, so two workers never lease the same URL
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.connection.execute("SELECT id, url FROM urls WHERE state = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row:
+                self.connection.execute(
+                    "UPDATE urls SET state = 'leased', lease_expires = ?, worker = ? WHERE id = ?",
+                    (time.time() + lease_seconds, worker_id, row[0]),
+                )
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        return row[1] if row else None
+
+    def complete(self, url, new_links, is_bio):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute("UPDATE urls SET state = 'done', lease_expires = NULL WHERE url = ?", (url,))
+            self.connection.executemany("INSERT OR IGNORE INTO urls (url) VALUES (?)", [(link,) for link in new_links])
+            if is_bio:
+                self.connection.execute("INSERT OR IGNORE INTO bio_urls (url) VALUES (?)", (url,))
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def requeue_expired(self):
+        cursor = self.connection.execute(
+            "UPDATE urls SET state = 'queued', worker = NULL WHERE state = 'leased' AND lease_expires < ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+    def is_done(self):
+        row = self.connection.execute("SELECT COUNT(*) FROM urls WHERE state IN ('queued', 'leased')").fetchone()
+        return row[0] == 0
+
+    def bio_urls(self):
+        return [row[0] for row in self.connection.execute("SELECT url FROM bio_urls ORDER BY id")]
+
+
+class RedisWorkQueue:
+    """
+    Work queue in Redis (or any server speaking the Redis protocol and Lua
+    scripting), shared by workers on several machines. Lease expiry uses the
+    workers' clocks, so they should be kept in sync.
+    """
+
+    def __init__(self, client, prefix="crawl"):
+        """
+        Args:
+            client: A redis.Redis client (decode_responses=True).
+            prefix (str): Prefix of every key, so several crawls can share a server.
+        """
+        self.client = client
+        self.seen_key = f"{prefix}:seen"
+        self.queue_key = f"{prefix}:queue"
+        self.leased_key = f"{prefix}:leased"
+        self.bio_key = f"{prefix}:bio"
+        self._push = client.register_script(_REDIS_PUSH)
+        self._lease = client.register_script(_REDIS_LEASE)
+        self._complete = client.register_script(_REDIS_COMPLETE)
+        self._requeue = client.register_script(_REDIS_REQUEUE)
+
+    def push(self, urls):
+        urls = list(urls)
+        if not urls:
+            return 0
+        return self._push(keys=[self.seen_key, self.queue_key], args=urls)
+
+    def mark_known(self, urls):
+        urls = list(urls)
+        if urls:
+            pipeline = self.client.pipeline()
+            pipeline.sadd(self.seen_key, *urls)
+            pipeline.zadd(self.bio_key, {url: time.time() for url in urls}, nx=True)
+            pipeline.execute()
+
+    def lease(self, worker_id, lease_seconds):
+        return self._lease(keys=[self.queue_key, self.leased_key], args=[time.time() + lease_seconds]) or None
+
+    def complete(self, url, new_links, is_bio):
+        self._complete(keys=[self.seen_key, self.queue_key, self.leased_key, self.bio_key],
+                       args=[url, "1" if is_bio else "0", time.time()] + list(new_links))
+
+    def requeue_expired(self):
+        return self._requeue(keys=[self.queue_key, self.leased_key], args=[time.time()])
+
+    def is_done(self):
+        # Both counts are read in one MULTI/EXEC, so a completion cannot fall between them
+        pipeline = self.client.pipeline()
+        pipeline.llen(self.queue_key)
+        pipeline.zcard(self.leased_key)
+        queued, leased = pipeline.execute()
+        return queued == 0 and leased == 0
+
+    def bio_urls(self):
+        return list(self.client.zrange(self.bio_key, 0, -1))
+
+
+# Function to open a work queue from a location string
+def open_work_queue(location):
+    """
+    Args:
+        location (str): "memory", "redis://host:port/db" (optionally followed by
+            "#prefix"), or the path of an SQLite file.
+    """
+    if location == "memory":
+        return InMemoryWorkQueue()
+    if location.startswith(("redis://", "rediss://")):
+        import redis  # Only needed for the Redis backend
+
+        location, _, prefix = location.partition("#")
+        return RedisWorkQueue(redis.Redis.from_url(location, decode_responses=True), prefix or "crawl")
+    return SQLiteWorkQueue(location)
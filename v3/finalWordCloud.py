@@ -1,9 +1,5 @@
 import csv
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 import os
-import arabic_reshaper
-from bidi.algorithm import get_display
 import unicodedata
 
 def is_arabic_text(text):
@@ -22,6 +18,12 @@ def is_arabic_text(text):
     return False
 
 def generate_word_cloud(csv_file, title, save_path=None):
+    # Imported here rather than at the top, so importing this module stays cheap
+    from wordcloud import WordCloud
+    import matplotlib.pyplot as plt
+    import arabic_reshaper
+    from bidi.algorithm import get_display
+
     try:
         # Read the CSV file and create a dictionary of words and their frequencies
         word_freq = {}
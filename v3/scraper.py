@@ -2,14 +2,22 @@ import requests
 from bs4 import BeautifulSoup
 from finalMapping import is_it_a_nationality
 from finalWordCloud import generate_word_cloud
-from gliner import GLiNER
 import re
 import csv
 from collections import Counter
 import os
 
-# Initialize GLiNER with the base model
-model = GLiNER.from_pretrained("urchade/gliner_multi-v2.1")
+# GLiNER with the base model, loaded the first time it is needed (see get_model)
+model = None
+
+
+# Function to load the model on first use, so importing this file does not load torch and the weights
+def get_model():
+    global model
+    if model is None:
+        from gliner import GLiNER
+        model = GLiNER.from_pretrained("urchade/gliner_multi-v2.1")
+    return model
 
 # Predefined list of common pronouns (case-insensitive)
 pronoun_list = {"he", "she", "him", "her", "it", "they", "them", "we", "us", "i", "me", "you", "his", "their", "our"}
@@ -21,7 +29,7 @@ labels = ["Person", "Country", "Date", "Place", "City"]
 def extract_entities(biography_content):
     all_entities = []
     for chunk in biography_content:
-        entities = model.predict_entities(chunk, labels, threshold=0.5)
+        entities = get_model().predict_entities(chunk, labels, threshold=0.5)
         all_entities.extend(entities)
 
     # Categorize entities into separate groups for better distinction